@@ -0,0 +1,467 @@
+# SPDX-License-Identifier: MIT
+#
+# LSFG-VK Launcher — core (no GTK)
+# - Settings model + persistence
+# - Host helpers (flatpak-spawn --host), flatpak inventory
+# - lsfg-vk env / launch command construction, headless favorite launch
+#
+# Kept free of gi imports so it can be benchmarked and scripted on a plain box.
+
+import os
+import json
+import shlex
+import select
+import threading
+import subprocess
+from dataclasses import dataclass, asdict, field
+from pathlib import Path
+
+from lsfgvk_trace import span, traced
+from lsfgvk_journal import Journal
+
+APP_ID = "io.reaven.LSFGVKLauncher"
+
+# Same lookup as GLib.get_user_config_dir() (XDG_CONFIG_HOME is set inside the sandbox)
+CONFIG_DIR = Path(os.environ.get("XDG_CONFIG_HOME") or Path.home() / ".config") / "lsfgvk-launcher"
+CONFIG_FILE = CONFIG_DIR / "settings.json"       # lang, last_*, options (small, rewritten on save)
+LEGACY_BACKUP = CONFIG_DIR / "settings.json.legacy"
+HISTORY_DB = CONFIG_DIR / "history.sqlite3"
+TRACE_DIR = CONFIG_DIR / "traces"
+
+MULTIPLIERS = ["2", "3", "4", "6", "8"]
+
+# ---------------- Settings model ----------------
+
+@dataclass
+class Options:
+    multiplier: int = 2
+    flow_scale: int = 0
+    performance: bool = False
+    hdr: bool = False
+    present_mode: str = ""          # "" (none) or custom
+    lsfg_process: str = ""
+    extra_args: str = ""
+    mangohud: bool = False
+    extra_layers: str = ""          # additional layers tokens (':'-separated)
+    detect_process: bool = False    # watch the launched tree and offer the Vulkan process as LSFG_PROCESS
+    monitor: bool = False           # sample the launched tree's CPU/RSS/threads/context switches
+    monitor_interval: float = 1.0   # seconds between samples (the host agent may stretch it to stay in budget)
+
+@dataclass
+class Settings:
+    lang: str = "fr"
+    last_flatpak: str = ""
+    last_host_cmd: str = ""
+    favorites: list[dict] = field(default_factory=list)   # list of {"name":..., "mode":"flatpak|host", "target":"...", "options":{...}}
+    options: Options = field(default_factory=Options)
+    groups: list[dict] = field(default_factory=list)      # launch groups, see lsfgvk_groups.py
+    rules: list[dict] = field(default_factory=list)       # auto-profile rules, see lsfgvk_rules.py
+
+def settings_from_dict(data: dict) -> Settings:
+    # nested dataclass rebuild
+    return Settings(
+        lang=data.get("lang", "fr"),
+        last_flatpak=data.get("last_flatpak", ""),
+        last_host_cmd=data.get("last_host_cmd", ""),
+        favorites=data.get("favorites", []),
+        options=Options(**data.get("options", {})),
+        groups=data.get("groups", []),
+        rules=data.get("rules", []),
+    )
+
+# Favorites, launch groups and rules live in the journal store (one appended line per change);
+# settings.json only keeps the small scalar part. Launches go to the SQLite history.
+_STORE: Journal | None = None
+_RULES_REVISION = 0     # bumped whenever Settings.rules may have changed (compiled matcher cache)
+
+def rules_revision() -> int:
+    return _RULES_REVISION
+
+def _rules_changed() -> None:
+    global _RULES_REVISION
+    _RULES_REVISION += 1
+
+def store() -> Journal:
+    global _STORE
+    if _STORE is None:
+        _STORE = Journal(CONFIG_DIR, "store")
+    return _STORE
+
+def favorite_key(mode: str, name: str) -> str:
+    return f"{mode}:{name}"
+
+def _migrate_legacy(data: dict) -> None:
+    """
+    settings.json from before the journal carried favorites/groups inline: move them to the store
+    once, keep a copy of the original file, and shrink settings.json.
+    """
+    st = store()
+    if not st.exists():
+        st.reset("favorite", {favorite_key(f.get("mode", ""), f.get("name", "")): f for f in data.get("favorites", [])})
+        st.reset("group", {g.get("name", ""): g for g in data.get("groups", [])})
+        st.compact()
+    if not LEGACY_BACKUP.exists():
+        LEGACY_BACKUP.write_text(json.dumps(data, indent=2, ensure_ascii=False), encoding="utf-8")
+    _write_small(data)
+
+def _small_dict(data: dict) -> dict:
+    return {k: v for k, v in data.items() if k not in ("favorites", "groups", "rules")}
+
+def _write_small(data: dict) -> None:
+    CONFIG_DIR.mkdir(parents=True, exist_ok=True)
+    tmp = CONFIG_FILE.with_suffix(".json.tmp")
+    tmp.write_text(json.dumps(_small_dict(data), indent=2, ensure_ascii=False), encoding="utf-8")
+    os.replace(tmp, CONFIG_FILE)
+
+@traced("settings.load")
+def load_settings() -> Settings:
+    data: dict = {}
+    if CONFIG_FILE.exists():
+        try:
+            data = json.loads(CONFIG_FILE.read_text(encoding="utf-8"))
+        except Exception:
+            data = {}
+    if "favorites" in data or "groups" in data:
+        _migrate_legacy(data)
+    st = store().load()
+    data = _small_dict(data)
+    data["favorites"] = list(st.items("favorite").values())
+    data["groups"] = list(st.items("group").values())
+    data["rules"] = list(st.items("rule").values())
+    _rules_changed()
+    try:
+        return settings_from_dict(data)
+    except Exception:
+        return Settings(favorites=data["favorites"], groups=data["groups"], rules=data["rules"])
+
+@traced("settings.save")
+def save_settings(s: Settings) -> None:
+    """
+    Writes the small document only; favorites/groups are persisted by the put_*/remove_* helpers.
+    """
+    # favorites/groups deliberately not serialized here (asdict would deep-copy them all)
+    _write_small({
+        "lang": s.lang,
+        "last_flatpak": s.last_flatpak,
+        "last_host_cmd": s.last_host_cmd,
+        "options": asdict(s.options),
+    })
+
+def replace_collections(s: Settings) -> None:
+    """
+    Rewrites the store from s.favorites / s.groups / s.rules (settings import, reset).
+    """
+    st = store()
+    st.reset("favorite", {favorite_key(f.get("mode", ""), f.get("name", "")): f for f in s.favorites})
+    st.reset("group", {g.get("name", ""): g for g in s.groups})
+    st.reset("rule", {rule_key(r): r for r in s.rules})
+    _rules_changed()
+
+def _put(s_items: list[dict], kind: str, key: str, entry: dict) -> None:
+    # The store and s_items share the same dict objects (load_settings / replace_collections),
+    # so an existing entry is updated in place: no list scan, O(1) whatever the preset count.
+    st = store()
+    old = st.items(kind).get(key)
+    if old is None:
+        s_items.append(entry)
+    elif old is not entry:
+        old.clear()
+        old.update(entry)
+        entry = old
+    st.put(kind, key, entry)
+
+def put_favorite(s: Settings, entry: dict) -> None:
+    """
+    Inserts or replaces (same mode + name) a favorite, in memory and in the store.
+    s must come from load_settings() or have been passed to replace_collections().
+    """
+    _put(s.favorites, "favorite", favorite_key(entry.get("mode", ""), entry.get("name", "")), entry)
+
+def remove_favorite(s: Settings, mode: str, name: str) -> None:
+    s.favorites = [f for f in s.favorites if not (f.get("mode") == mode and f.get("name") == name)]
+    store().delete("favorite", favorite_key(mode, name))
+
+def put_group(s: Settings, data: dict) -> None:
+    _put(s.groups, "group", data.get("name", ""), data)
+
+def remove_group(s: Settings, name: str) -> None:
+    s.groups = [g for g in s.groups if g.get("name") != name]
+    store().delete("group", name)
+
+def rule_key(data: dict) -> str:
+    return f"{data.get('field', '')}:{data.get('kind', '')}:{data.get('pattern', '')}"
+
+def put_rule(s: Settings, data: dict) -> None:
+    """
+    Inserts or replaces (same field + kind + pattern) an auto-profile rule.
+    """
+    _put(s.rules, "rule", rule_key(data), data)
+    _rules_changed()
+
+def remove_rule(s: Settings, key: str) -> None:
+    s.rules = [r for r in s.rules if rule_key(r) != key]
+    store().delete("rule", key)
+    _rules_changed()
+
+_HISTORY = None     # lsfgvk_history.History, created by the first history() call
+_HISTORY_LOCK = threading.Lock()
+
+def history():
+    global _HISTORY
+    if _HISTORY is None:
+        # first callers race (GUI thread vs. the flatpak list worker): one History, one writer
+        with _HISTORY_LOCK:
+            if _HISTORY is None:
+                # sqlite3 + hashlib only load with the first history access, not at startup
+                from lsfgvk_history import History
+                hist = History(HISTORY_DB)
+                # launch records kept in the journal by earlier versions: move them over once
+                old = store().items("launch")
+                if old:
+                    hist.import_rows([
+                        (r.get("mode", ""), r.get("target", ""), r.get("preset", ""), "", r.get("time", 0.0))
+                        for r in old.values()
+                    ])
+                    store().reset("launch", {})
+                _HISTORY = hist
+    return _HISTORY
+
+def record_launch(mode: str, target: str, preset: str = "", options: Options | dict | None = None,
+                  popen: subprocess.Popen | None = None) -> int:
+    """
+    Queues a history row for this launch; with popen, its end time and exit code follow.
+    """
+    if isinstance(options, dict):
+        options = options_from_snapshot(options)   # same hash for a favorite and the GUI options
+    h = history()
+    token = h.start(mode, target, preset, asdict(options) if options is not None else None)
+    if popen is not None:
+        h.track(token, popen)
+    return token
+
+def options_from_snapshot(snap: dict) -> Options:
+    """
+    Favorites store options as plain dicts; ignore unknown keys from newer/older versions.
+    """
+    known = Options.__dataclass_fields__
+    return Options(**{k: v for k, v in snap.items() if k in known})
+
+# ---------------- Host helpers (flatpak-spawn) ----------------
+
+def run_host(args: list[str]) -> tuple[int, str, str]:
+    """
+    Run a command on the host through flatpak-spawn --host.
+    Returns (code, stdout, stderr).
+    """
+    with span("host.run", cmd=args[0] if args else ""):
+        proc = subprocess.run(
+            ["flatpak-spawn", "--host"] + args,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            text=True,
+        )
+    return proc.returncode, proc.stdout, proc.stderr
+
+def host_has_flatpak() -> bool:
+    code, _, _ = run_host(["sh", "-lc", "command -v flatpak >/dev/null 2>&1"])
+    return code == 0
+
+def parse_flatpak_list(out: str) -> list[tuple[str, str]]:
+    """
+    Parses `flatpak list --columns=application,title` output into (appid, title), sorted by title.
+    """
+    rows = []
+    for line in out.splitlines():
+        if not line.strip():
+            continue
+        parts = line.split("\t")
+        appid = parts[0].strip()
+        title = parts[1].strip() if len(parts) > 1 else appid
+        rows.append((appid, title))
+    # sort by title
+    rows.sort(key=lambda x: x[1].lower())
+    return rows
+
+@traced("host.list_flatpaks")
+def list_flatpaks() -> list[tuple[str, str]]:
+    """
+    Returns list of (appid, title). Uses host flatpak CLI.
+    """
+    if not host_has_flatpak():
+        return []
+    # columns: application,title are widely available
+    code, out, _ = run_host(["flatpak", "list", "--app", "--columns=application,title"])
+    if code != 0:
+        return []
+    return parse_flatpak_list(out)
+
+# Lists the root pid's process tree (ps + awk, no python needed on the host) and asks
+# xdotool whether any of them owns a visible window. Exit 0 = yes, 1 = no, 2 = no xdotool.
+_WINDOW_PROBE_SH = r"""
+command -v xdotool >/dev/null 2>&1 || exit 2
+pids=$(ps -e -o pid=,ppid= | awk -v root="$1" '
+  { pp[$1] = $2 }
+  END { for (p in pp) { q = p; while (q > 1) { if (q == root) { print p; break } q = pp[q] } } }')
+for p in $pids; do xdotool search --onlyvisible --pid "$p" >/dev/null 2>&1 && exit 0; done
+exit 1
+"""
+
+def host_window_visible(root_pid: int) -> bool | None:
+    """
+    True when a process in root_pid's host tree has a visible (X11/XWayland) window.
+    None when the host cannot tell (no xdotool).
+    """
+    code, _, _ = run_host(["sh", "-c", _WINDOW_PROBE_SH, "sh", str(root_pid)])
+    if code == 2:
+        return None
+    return code == 0
+
+# ---------------- Env / command construction ----------------
+
+def build_env(opts: Options) -> dict[str, str]:
+    env: dict[str, str] = {}
+    present = opts.present_mode.strip()
+    lsfg_proc = opts.lsfg_process.strip()
+    extra_layers = opts.extra_layers.strip()
+
+    env["LSFG_MULTIPLIER"] = str(int(opts.multiplier))
+    env["LSFG_FLOW_SCALE"] = str(int(opts.flow_scale))
+    env["LSFG_PERFORMANCE_MODE"] = "1" if opts.performance else "0"
+    env["LSFG_HDR_MODE"] = "1" if opts.hdr else "0"
+    if present:
+        env["LSFG_PRESENT_MODE"] = present
+    if lsfg_proc:
+        env["LSFG_PROCESS"] = lsfg_proc
+
+    layers = ["lsfg_vk"]
+    if opts.mangohud:
+        layers.append("VK_LAYER_MANGOHUD_overlay")
+        env["MANGOHUD"] = "1"
+    if extra_layers:
+        layers.extend([tok for tok in extra_layers.split(":") if tok])
+
+    env["VK_INSTANCE_LAYERS"] = ":".join(layers)
+    return env
+
+def env_to_flatpak_args(env: dict[str, str]) -> list[str]:
+    args: list[str] = []
+    for k, v in env.items():
+        args += ["--env", f"{k}={v}"]
+    return args
+
+def env_prefix_shell(env: dict[str, str]) -> str:
+    return " ".join(f"{k}={shlex.quote(v)}" for k, v in env.items())
+
+def split_args(text: str) -> list[str]:
+    return shlex.split(text.strip()) if text and text.strip() else []
+
+def flatpak_launch_cmd(appid: str, env: dict[str, str], extra: list[str]) -> list[str]:
+    return ["flatpak-spawn", "--host", "flatpak", "run"] + env_to_flatpak_args(env) + [appid] + extra
+
+def host_launch_cmd(target: str, env: dict[str, str], extra: list[str]) -> list[str]:
+    env_prefix = env_prefix_shell(env)
+    shell = f"{env_prefix} exec {shlex.quote(target)} {' '.join(shlex.quote(x) for x in extra)}"
+    return ["flatpak-spawn", "--host", "sh", "-lc", shell]
+
+def favorite_launch_cmd(fav: dict) -> list[str]:
+    opts = options_from_snapshot(fav.get("options", {}))
+    env = build_env(opts)
+    extra = split_args(opts.extra_args)
+    if fav.get("mode") == "flatpak":
+        return flatpak_launch_cmd(fav.get("target", ""), env, extra)
+    return host_launch_cmd(fav.get("target", ""), env, extra)
+
+# ---------------- Spawning with host pid ----------------
+
+@dataclass
+class HostProcess:
+    popen: subprocess.Popen
+    host_pid: int | None    # pid of the launched command on the host (None if it never reported)
+
+def _read_host_pid(r: int, timeout: float) -> int | None:
+    try:
+        ready, _, _ = select.select([r], [], [], timeout)
+        if ready:
+            line = os.read(r, 64).decode(errors="replace").strip()
+            return int(line) if line.isdigit() else None
+        return None
+    finally:
+        os.close(r)
+
+def spawn_host(cmd: list[str], pid_timeout: float = 5.0, on_pid=None) -> HostProcess:
+    """
+    Starts a `flatpak-spawn --host ...` command (as built by *_launch_cmd) and learns its host pid:
+    a wrapper shell writes $$ to a forwarded pipe fd, then execs the command (same pid).
+    The pipe is forwarded as fd 9 and closed before exec, so the launched app inherits no extra
+    fd and its stdout/stderr are untouched.
+
+    Waits up to pid_timeout for the pid. With on_pid, returns at once (host_pid None) and
+    calls on_pid(host_pid or None) from a worker thread instead: for callers on the GTK main loop.
+    """
+    assert cmd[:2] == ["flatpak-spawn", "--host"], cmd
+    r, w = os.pipe()
+    try:
+        # dash (the host's sh on Debian/Ubuntu) only takes single-digit fds in redirections and a
+        # GTK process usually hands out higher ones: a sandbox-side sh reopens the pipe as fd 9
+        # for flatpak-spawn (which forwards fds under the same number) so the host wrapper can
+        # close it. flatpak-spawn itself keeps the original fd, but never writes to it.
+        wrapper = 'echo $$ >&9; exec "$@" 9>&-'
+        argv = ["sh", "-c", f'exec "$@" 9>/dev/fd/{w}', "sh",
+                "flatpak-spawn", "--host", "--forward-fd=9", "sh", "-c", wrapper, "sh"] + cmd[2:]
+        with span("launch.popen", target=cmd[-1] if len(cmd) > 2 else ""):
+            proc = subprocess.Popen(argv, pass_fds=(w,))
+    finally:
+        os.close(w)
+    if on_pid is None:
+        return HostProcess(popen=proc, host_pid=_read_host_pid(r, pid_timeout))
+    threading.Thread(target=lambda: on_pid(_read_host_pid(r, pid_timeout)),
+                     name=f"host-pid-{proc.pid}", daemon=True).start()
+    return HostProcess(popen=proc, host_pid=None)
+
+# ---------------- Headless launch ----------------
+
+class LaunchError(Exception):
+    pass
+
+def find_favorite(settings: Settings, name: str, mode: str | None = None) -> dict | None:
+    for f in settings.favorites:
+        if f.get("name") == name and (mode is None or f.get("mode") == mode):
+            return f
+    return None
+
+@traced("launch.favorite_headless")
+def launch_favorite(settings: Settings, fav: dict) -> subprocess.Popen:
+    """
+    Same steps as the GUI Run button (probe, remember target, spawn), without GTK.
+    """
+    target = fav.get("target", "")
+    if not target:
+        raise LaunchError(f"favorite '{fav.get('name')}' has no target")
+    if fav.get("mode") == "flatpak":
+        if not host_has_flatpak():
+            raise LaunchError("flatpak CLI not available on host.")
+        settings.last_flatpak = target
+    else:
+        settings.last_host_cmd = target
+    save_settings(settings)
+    cmd = favorite_launch_cmd(fav)
+    with span("launch.popen", target=target):
+        proc = subprocess.Popen(cmd)
+    record_launch(fav.get("mode", ""), target, fav.get("name", ""), fav.get("options", {}), proc)
+    return proc
+
+def run_favorite(name: str, mode: str | None = None, wait: bool = False) -> int:
+    """
+    Entry point for `lsfgvk-launcher --run NAME`: launch a favorite without opening a window.
+    """
+    settings = load_settings()
+    fav = find_favorite(settings, name, mode)
+    if fav is None:
+        print(f"lsfgvk-launcher: no favorite named '{name}'")
+        return 2
+    try:
+        proc = launch_favorite(settings, fav)
+    except LaunchError as e:
+        print(f"lsfgvk-launcher: {e}")
+        return 1
+    return proc.wait() if wait else 0
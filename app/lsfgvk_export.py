@@ -0,0 +1,268 @@
+# SPDX-License-Identifier: MIT
+#
+# LSFG-VK Launcher — favorites exported as standalone launchers
+# - One POSIX shell script per favorite: env, layers and target already resolved, so a kiosk /
+#   benchmark box starts the game without Python, GTK or the host probes
+# - One .desktop entry per favorite pointing at its script
+# - Incremental: a manifest keeps each favorite's fingerprint; only changed favorites are
+#   rewritten, files of deleted favorites are removed
+# - verify_exports() runs every script in dry-run mode and diffs its env + argv against the
+#   command the GUI would launch
+#
+# The scripts run on the host (no flatpak-spawn): in the Flatpak, the config dir lives under
+# ~/.var/app/<id>/config, which is the same path on the host.
+
+import os
+import re
+import json
+import shlex
+import difflib
+import hashlib
+import subprocess
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from lsfgvk_trace import span, traced
+from lsfgvk_core import (
+    APP_ID, CONFIG_DIR, Settings, build_env, env_to_flatpak_args, favorite_key,
+    favorite_launch_cmd, load_settings, options_from_snapshot, split_args,
+)
+
+EXPORT_DIR = CONFIG_DIR / "exports"
+MANIFEST = "manifest.json"
+EXPORT_FORMAT = 1            # bump when the rendered files change: forces a full rewrite
+DRY_RUN_ENV = "LSFGVK_EXPORT_DRY_RUN"
+
+@dataclass
+class ExportResult:
+    directory: Path
+    written: list[str] = field(default_factory=list)     # favorite keys (re)written
+    unchanged: int = 0
+    removed: list[str] = field(default_factory=list)     # favorite keys whose files were deleted
+
+# ---------------- Launch spec ----------------
+
+def host_spec(fav: dict) -> tuple[dict[str, str], list[str]]:
+    """
+    (env, argv) the favorite runs with on the host: Flatpak apps get their env through
+    `flatpak run --env`, host commands through the environment.
+    """
+    opts = options_from_snapshot(fav.get("options", {}))
+    env = build_env(opts)
+    extra = split_args(opts.extra_args)
+    target = fav.get("target", "")
+    if fav.get("mode") == "flatpak":
+        return {}, ["flatpak", "run"] + env_to_flatpak_args(env) + [target] + extra
+    return env, [target] + extra
+
+def gui_spec(cmd: list[str]) -> tuple[dict[str, str], list[str]]:
+    """
+    (env, argv) of a command built by *_launch_cmd: drops `flatpak-spawn --host` and unwraps
+    the `sh -lc "K=V … exec target args"` used for host commands.
+    """
+    argv = cmd[2:] if cmd[:2] == ["flatpak-spawn", "--host"] else list(cmd)
+    if argv[:2] != ["sh", "-lc"] or len(argv) != 3:
+        return {}, argv
+    words = shlex.split(argv[2])
+    env: dict[str, str] = {}
+    while words and re.match(r"[A-Za-z_][A-Za-z0-9_]*=", words[0]):
+        key, _, value = words.pop(0).partition("=")
+        env[key] = value
+    if words[:1] == ["exec"]:
+        words.pop(0)
+    return env, words
+
+# ---------------- Rendering ----------------
+
+def _slug(fav: dict) -> str:
+    # readable + short hash of the key: "A B" and "A-B" must not share a file
+    name = re.sub(r"[^A-Za-z0-9._-]+", "-", fav.get("name", "")).strip("-.")[:48] or "preset"
+    key = favorite_key(fav.get("mode", ""), fav.get("name", ""))
+    return f"lsfgvk-{fav.get('mode', 'host')}-{name}-{hashlib.sha1(key.encode('utf-8')).hexdigest()[:6]}"
+
+def fingerprint(fav: dict, directory: Path) -> str:
+    # favorites are stored as written by the GUI, so key order is stable: no sort_keys needed
+    data = f"{EXPORT_FORMAT}\0{directory}\0" + json.dumps(fav, ensure_ascii=False, check_circular=False)
+    return hashlib.sha1(data.encode("utf-8")).hexdigest()[:16]
+
+def _one_line(text: str) -> str:
+    return " ".join(str(text).split())
+
+def render_script(fav: dict) -> str:
+    env, argv = host_spec(fav)
+    lines = [
+        "#!/bin/sh",
+        f"# LSFG-VK Launcher export of favorite '{_one_line(fav.get('name', ''))}' ({fav.get('mode', '')})",
+        "# Generated file: changes are overwritten by the next export.",
+        f"# Dry run: {DRY_RUN_ENV}=1 prints the env and argv instead of launching.",
+    ]
+    lines += [f"export {k}={shlex.quote(v)}" for k, v in env.items()]
+    lines.append("set -- " + " ".join(shlex.quote(a) for a in argv) + ' "$@"')
+    lines.append(f'if [ -n "${{{DRY_RUN_ENV}:-}}" ]; then')
+    env_words = " ".join(f'"{k}=${k}"' for k in env)
+    lines.append(f"    printf '%s\\0' env {env_words} argv \"$@\"" if env else "    printf '%s\\0' env argv \"$@\"")
+    lines += ["    exit 0", "fi", 'exec "$@"', ""]
+    return "\n".join(lines)
+
+def _desktop_escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", " ").replace("\r", " ").replace("\t", " ")
+
+def _desktop_exec(path: Path) -> str:
+    # Exec= quoting (Desktop Entry spec): reserved chars need a quoted argument
+    text = str(path)
+    if re.search(r"[\s\"'\\><~|&;$*?#()`]", text):
+        text = '"' + re.sub(r'(["`$\\])', r"\\\1", text) + '"'
+    return text.replace("%", "%%")
+
+def render_desktop(fav: dict, script: Path) -> str:
+    name = _desktop_escape(_one_line(fav.get("name", "")))
+    target = _desktop_escape(_one_line(fav.get("target", "")))
+    icon = target if fav.get("mode") == "flatpak" else APP_ID
+    return "\n".join([
+        "[Desktop Entry]",
+        "Type=Application",
+        f"Name={name} (LSFG-VK)",
+        f"Comment=Launch {target} with lsfg-vk",
+        f"Exec={_desktop_exec(script)}",
+        f"Icon={icon}",
+        "Terminal=false",
+        "Categories=Game;",
+        "",
+    ])
+
+# ---------------- Export ----------------
+
+def _write(path: Path, text: str, mode: int) -> None:
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.write_text(text, encoding="utf-8")
+    os.chmod(tmp, mode)
+    os.replace(tmp, path)
+
+def _unlink(path: Path) -> None:
+    try:
+        path.unlink()
+    except FileNotFoundError:
+        pass
+
+def read_manifest(directory: Path) -> dict[str, dict]:
+    try:
+        data = json.loads((Path(directory) / MANIFEST).read_text(encoding="utf-8"))
+    except (FileNotFoundError, ValueError):
+        return {}
+    return data.get("favorites", {}) if isinstance(data, dict) else {}
+
+def exports_enabled(directory: Path = EXPORT_DIR) -> bool:
+    """True once an export has been made there (the GUI then keeps it in sync)."""
+    return (Path(directory) / MANIFEST).exists()
+
+@traced("export.favorites")
+def export_favorites(settings: Settings, directory: Path = EXPORT_DIR) -> ExportResult:
+    """
+    Writes <slug>.sh + <slug>.desktop per favorite; favorites whose fingerprint did not
+    change (and whose files are still there) are skipped, stale ones removed.
+    """
+    directory = Path(directory).absolute()
+    directory.mkdir(parents=True, exist_ok=True)
+    result = ExportResult(directory)
+    old = read_manifest(directory)
+    present = set(os.listdir(directory))    # one syscall instead of two stat() per favorite
+    new: dict[str, dict] = {}
+    for fav in settings.favorites:
+        if not fav.get("target"):
+            continue
+        key = favorite_key(fav.get("mode", ""), fav.get("name", ""))
+        prev = old.get(key)
+        fp = fingerprint(fav, directory)
+        if prev is not None and prev.get("fingerprint") == fp \
+                and prev.get("script") in present and prev.get("desktop") in present:
+            new[key] = prev
+            result.unchanged += 1
+            continue
+        slug = _slug(fav)
+        entry = new[key] = {"fingerprint": fp, "script": f"{slug}.sh", "desktop": f"{slug}.desktop"}
+        script, desktop = directory / entry["script"], directory / entry["desktop"]
+        _write(script, render_script(fav), 0o755)
+        _write(desktop, render_desktop(fav, script), 0o644)
+        result.written.append(key)
+    keep = {e[k] for e in new.values() for k in ("script", "desktop")}
+    for key, entry in old.items():
+        if new.get(key) == entry:
+            continue
+        for k in ("script", "desktop"):
+            name = entry.get(k)
+            # only ever delete files of our own naming scheme
+            if name and name not in keep and name.startswith("lsfgvk-") and "/" not in name:
+                _unlink(directory / name)
+        if key not in new:
+            result.removed.append(key)
+    if result.written or old.keys() != new.keys() or MANIFEST not in present:
+        _write(directory / MANIFEST, json.dumps({"format": EXPORT_FORMAT, "favorites": new}, ensure_ascii=False), 0o644)
+    return result
+
+# ---------------- Verification ----------------
+
+def _dry_run(script: Path) -> tuple[dict[str, str], list[str]]:
+    env = dict(os.environ)
+    env[DRY_RUN_ENV] = "1"
+    out = subprocess.run(["sh", str(script)], env=env, capture_output=True, timeout=10, check=True).stdout
+    words = out.decode("utf-8", errors="replace").split("\0")[:-1]
+    i = words.index("argv")
+    pairs = (w.partition("=") for w in words[1:i])
+    return {k: v for k, _, v in pairs}, words[i + 1:]
+
+def _spec_lines(env: dict[str, str], argv: list[str]) -> list[str]:
+    return [f"env {k}={env[k]}" for k in sorted(env)] + [f"argv[{i}] {a}" for i, a in enumerate(argv)]
+
+@traced("export.verify")
+def verify_exports(settings: Settings, directory: Path = EXPORT_DIR) -> list[str]:
+    """
+    One report line (or unified diff) per favorite whose exported script would not launch
+    exactly what the GUI launches; empty when everything matches.
+    """
+    directory = Path(directory).absolute()
+    manifest = read_manifest(directory)
+    problems: list[str] = []
+    for fav in settings.favorites:
+        if not fav.get("target"):
+            continue
+        key = favorite_key(fav.get("mode", ""), fav.get("name", ""))
+        entry = manifest.get(key)
+        if entry is None:
+            problems.append(f"{key}: not exported")
+            continue
+        script = directory / entry["script"]
+        with span("export.verify_one", favorite=key):
+            try:
+                got = _dry_run(script)
+            except (OSError, ValueError, subprocess.SubprocessError) as e:
+                problems.append(f"{key}: {script.name} failed: {e}")
+                continue
+        want = gui_spec(favorite_launch_cmd(fav))
+        if got != want:
+            diff = difflib.unified_diff(_spec_lines(*want), _spec_lines(*got),
+                                        fromfile=f"gui {key}", tofile=script.name, lineterm="")
+            problems.append("\n".join(diff))
+        elif entry.get("fingerprint") != fingerprint(fav, directory):
+            problems.append(f"{key}: stale export (same command, favorite changed since)")
+    for key in manifest.keys() - {favorite_key(f.get("mode", ""), f.get("name", "")) for f in settings.favorites}:
+        problems.append(f"{key}: exported but no longer a favorite")
+    return problems
+
+# ---------------- Headless ----------------
+
+def run_export(directory: str | None = None, verify: bool = False) -> int:
+    """
+    Entry point for `lsfgvk-launcher --export [DIR]` / `--verify-export [DIR]`.
+    """
+    settings = load_settings()
+    target = Path(directory) if directory else EXPORT_DIR
+    if verify:
+        problems = verify_exports(settings, target)
+        for p in problems:
+            print(p)
+        print(f"lsfgvk-launcher: {len(problems)} mismatch(es) in {target}")
+        return 1 if problems else 0
+    res = export_favorites(settings, target)
+    print(f"lsfgvk-launcher: {len(res.written)} written, {res.unchanged} unchanged, "
+          f"{len(res.removed)} removed in {res.directory}")
+    return 0
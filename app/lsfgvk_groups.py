@@ -0,0 +1,226 @@
+# SPDX-License-Identifier: MIT
+#
+# LSFG-VK Launcher — launch groups
+# - A group is an ordered list of favorites started together (game + tools, N emulator instances…)
+# - Per member: start delay, optional "after member #i is ready", how readiness is detected
+# - Scheduler runs off the main thread; max_parallel bounds how many members are in their
+#   start-up phase at once, so disk/GPU heavy startups are staggered instead of competing
+#
+# Stored in Settings.groups as plain dicts (same style as favorites).
+
+import time
+import threading
+from dataclasses import dataclass, asdict, field
+
+from lsfgvk_trace import span
+from lsfgvk_core import (
+    Settings, LaunchError, find_favorite, favorite_launch_cmd,
+    host_has_flatpak, host_window_visible, spawn_host, load_settings, record_launch,
+)
+
+READY_MODES = ["start", "seconds", "window"]   # UI order
+WINDOW_POLL_S = 0.5
+
+@dataclass
+class GroupMember:
+    favorite: str
+    mode: str
+    delay: float = 0.0          # seconds to wait before starting (after ordering/dependency)
+    after: int = -1             # index of the member that must be ready first (-1 = none)
+    ready: str = "seconds"      # "start" | "seconds" | "window"
+    ready_timeout: float = 5.0  # "seconds": time until ready; "window": upper bound
+
+@dataclass
+class LaunchGroup:
+    name: str
+    members: list[GroupMember] = field(default_factory=list)
+    max_parallel: int = 1       # members allowed in their start-up phase at the same time
+
+def group_from_dict(data: dict) -> LaunchGroup:
+    known = GroupMember.__dataclass_fields__
+    members = [GroupMember(**{k: v for k, v in m.items() if k in known}) for m in data.get("members", [])]
+    return LaunchGroup(name=data.get("name", ""), members=members, max_parallel=max(1, int(data.get("max_parallel", 1))))
+
+def group_to_dict(group: LaunchGroup) -> dict:
+    return asdict(group)
+
+def find_group(settings: Settings, name: str) -> LaunchGroup | None:
+    for g in settings.groups:
+        if g.get("name") == name:
+            return group_from_dict(g)
+    return None
+
+def validate_group(group: LaunchGroup) -> None:
+    for i, m in enumerate(group.members):
+        if m.after >= i:
+            raise ValueError(f"member #{i + 1} ({m.favorite}) can only wait for an earlier member")
+        if m.ready not in READY_MODES:
+            raise ValueError(f"member #{i + 1} ({m.favorite}): unknown ready mode '{m.ready}'")
+
+# ---------------- Scheduler ----------------
+
+class GroupRun:
+    """
+    One execution of a launch group. Each member gets a worker thread that waits for:
+      1. the previous member to have *started* (keeps the configured order),
+      2. its dependency (if any) to be *ready*,
+      3. its own delay,
+      4. a free start-up slot (max_parallel),
+    then spawns, holds the slot until ready, and releases it.
+
+    on_event(index, state, detail) is called from worker threads with state in
+    "waiting", "starting", "started", "ready", "failed", "skipped", "done".
+    """
+
+    def __init__(self, settings: Settings, group: LaunchGroup, on_event=None):
+        validate_group(group)
+        self.settings = settings
+        self.group = group
+        self.on_event = on_event or (lambda *_: None)
+        n = len(group.members)
+        self.processes: list = [None] * n
+        self._started = [threading.Event() for _ in range(n)]
+        self._ready = [threading.Event() for _ in range(n)]
+        self._failed = [False] * n
+        self._slots = threading.BoundedSemaphore(max(1, group.max_parallel))
+        self._cancel = threading.Event()
+        self._flatpak_ok: bool | None = None
+        self._probe_lock = threading.Lock()
+        self._threads: list[threading.Thread] = []
+        self._done = threading.Event()
+
+    # ---- public
+    def start(self) -> "GroupRun":
+        for i in range(len(self.group.members)):
+            t = threading.Thread(target=self._run_member, args=(i,), name=f"group-{self.group.name}-{i}", daemon=True)
+            self._threads.append(t)
+            t.start()
+        threading.Thread(target=self._join_all, name=f"group-{self.group.name}", daemon=True).start()
+        return self
+
+    def cancel(self) -> None:
+        """Stops members that have not started yet; already running apps are left alone."""
+        self._cancel.set()
+        for ev in self._started + self._ready:
+            ev.set()
+
+    def wait(self, timeout: float | None = None) -> bool:
+        return self._done.wait(timeout)
+
+    @property
+    def failed(self) -> list[int]:
+        return [i for i, f in enumerate(self._failed) if f]
+
+    # ---- internals
+    def _emit(self, i: int, state: str, detail: str = "") -> None:
+        try:
+            self.on_event(i, state, detail)
+        except Exception:
+            pass
+
+    def _join_all(self) -> None:
+        for t in self._threads:
+            t.join()
+        self._done.set()
+        self._emit(-1, "done", "")
+
+    def _has_flatpak(self) -> bool:
+        # probed once per run instead of once per member
+        with self._probe_lock:
+            if self._flatpak_ok is None:
+                self._flatpak_ok = host_has_flatpak()
+            return self._flatpak_ok
+
+    def _give_up(self, i: int, state: str, detail: str) -> None:
+        self._failed[i] = True
+        self._emit(i, state, detail)
+        self._started[i].set()
+        self._ready[i].set()
+
+    def _run_member(self, i: int) -> None:
+        m = self.group.members[i]
+        self._emit(i, "waiting", "")
+        if i > 0:
+            self._started[i - 1].wait()
+        if m.after >= 0:
+            self._ready[m.after].wait()
+            if self._failed[m.after]:
+                self._give_up(i, "skipped", f"#{m.after + 1} failed")
+                return
+        if self._cancel.is_set() or self._cancel.wait(max(0.0, m.delay)):
+            self._give_up(i, "skipped", "cancelled")
+            return
+
+        fav = find_favorite(self.settings, m.favorite, m.mode)
+        if fav is None:
+            self._give_up(i, "failed", f"no favorite '{m.favorite}'")
+            return
+
+        with self._slots:
+            if self._cancel.is_set():
+                self._give_up(i, "skipped", "cancelled")
+                return
+            self._emit(i, "starting", fav.get("target", ""))
+            try:
+                with span("group.spawn", member=i, target=fav.get("target", "")):
+                    if fav.get("mode") == "flatpak" and not self._has_flatpak():
+                        raise LaunchError("flatpak CLI not available on host.")
+                    if not fav.get("target"):
+                        raise LaunchError(f"favorite '{m.favorite}' has no target")
+                    proc = spawn_host(favorite_launch_cmd(fav))
+            except (LaunchError, OSError) as e:
+                self._give_up(i, "failed", str(e))
+                return
+            self.processes[i] = proc
+            record_launch(fav.get("mode", ""), fav.get("target", ""), fav.get("name", ""), fav.get("options", {}), proc.popen)
+            self._started[i].set()
+            self._emit(i, "started", str(proc.host_pid or ""))
+            with span("group.wait_ready", member=i, mode=m.ready):
+                how = self._wait_ready(m, proc)
+            self._ready[i].set()
+            self._emit(i, "ready", how)
+
+    def _wait_ready(self, m: GroupMember, proc) -> str:
+        if m.ready == "start":
+            return "started"
+        deadline = time.monotonic() + max(0.0, m.ready_timeout)
+        if m.ready == "window" and proc.host_pid:
+            while not self._cancel.is_set():
+                if proc.popen.poll() is not None:
+                    return "exited"
+                visible = host_window_visible(proc.host_pid)
+                if visible is None:
+                    break   # host cannot tell: fall back to the timeout
+                if visible:
+                    return "window"
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return "timeout"
+                self._cancel.wait(min(WINDOW_POLL_S, remaining))
+        self._cancel.wait(max(0.0, deadline - time.monotonic()))
+        return "seconds"
+
+# ---------------- Headless ----------------
+
+def run_group(name: str) -> int:
+    """
+    Entry point for `lsfgvk-launcher --run-group NAME`: returns once every member is ready.
+    """
+    settings = load_settings()
+    group = find_group(settings, name)
+    if group is None:
+        print(f"lsfgvk-launcher: no launch group named '{name}'")
+        return 2
+
+    def report(i: int, state: str, detail: str) -> None:
+        if i >= 0:
+            m = group.members[i]
+            print(f"[{name}] #{i + 1} {m.favorite}: {state}{' (' + detail + ')' if detail else ''}", flush=True)
+
+    try:
+        run = GroupRun(settings, group, on_event=report).start()
+    except ValueError as e:
+        print(f"lsfgvk-launcher: {e}")
+        return 2
+    run.wait()
+    return 1 if run.failed else 0
@@ -0,0 +1,272 @@
+# SPDX-License-Identifier: MIT
+#
+# LSFG-VK Launcher — launch history (SQLite)
+# - One row per launch: mode, target, preset, options hash, start/end time, exit code
+# - Writes go through a queue to a single writer thread that commits in batches,
+#   so launching never waits on disk
+# - Frecency (frequency x recency buckets) ranks Flatpaks, host commands and favorites
+# - Resource sessions: one summary row per sampled launch (see lsfgvk_sampler.py), compared
+#   per preset for a given target
+#
+# WAL mode: readers (GUI thread, list workers) never block the writer.
+
+import time
+import json
+import queue
+import atexit
+import sqlite3
+import hashlib
+import itertools
+import threading
+from pathlib import Path
+
+from lsfgvk_trace import span
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS launches (
+    id          INTEGER PRIMARY KEY,
+    mode        TEXT NOT NULL,
+    target      TEXT NOT NULL,
+    preset      TEXT NOT NULL DEFAULT '',
+    options_hash TEXT NOT NULL DEFAULT '',
+    start       REAL NOT NULL,
+    end         REAL,
+    exit_code   INTEGER
+);
+CREATE INDEX IF NOT EXISTS launches_by_target ON launches (mode, target, start);
+CREATE INDEX IF NOT EXISTS launches_by_time ON launches (start);
+CREATE INDEX IF NOT EXISTS launches_by_preset ON launches (mode, preset, start);
+CREATE TABLE IF NOT EXISTS sessions (
+    id          INTEGER PRIMARY KEY,
+    mode        TEXT NOT NULL,
+    target      TEXT NOT NULL,
+    preset      TEXT NOT NULL DEFAULT '',
+    options_hash TEXT NOT NULL DEFAULT '',
+    start       REAL NOT NULL,
+    duration    REAL NOT NULL,
+    samples     INTEGER NOT NULL,
+    interval    REAL NOT NULL,
+    agent_cpu   REAL NOT NULL DEFAULT 0,
+    cpu_avg REAL, cpu_max REAL, rss_avg REAL, rss_max REAL, threads_avg REAL, threads_max REAL,
+    csw_avg REAL, csw_max REAL, io_r_avg REAL, io_r_max REAL, io_w_avg REAL, io_w_max REAL
+);
+CREATE INDEX IF NOT EXISTS sessions_by_target ON sessions (mode, target, start);
+"""
+
+SESSION_COLUMNS = [
+    "mode", "target", "preset", "options_hash", "start", "duration", "samples", "interval", "agent_cpu",
+    "cpu_avg", "cpu_max", "rss_avg", "rss_max", "threads_avg", "threads_max",
+    "csw_avg", "csw_max", "io_r_avg", "io_r_max", "io_w_avg", "io_w_max",
+]
+
+DAY = 86400.0
+# (max age in days, weight): a launch this week counts 100, one from last quarter 30…
+FRECENCY_BUCKETS = [(4, 100), (14, 70), (31, 50), (90, 30), (365, 10)]
+
+BATCH_MAX = 256
+BATCH_WINDOW_S = 0.25   # how long the writer gathers more operations before committing
+
+def options_hash(options: dict) -> str:
+    return hashlib.sha1(json.dumps(options, sort_keys=True).encode("utf-8")).hexdigest()[:12]
+
+def _frecency_sql(column: str) -> str:
+    cases = " ".join(f"WHEN start > :now - {days * DAY} THEN {weight}" for days, weight in FRECENCY_BUCKETS)
+    return (
+        f"SELECT {column}, SUM(CASE {cases} ELSE 0 END) FROM launches "
+        f"WHERE mode = :mode AND start > :now - {FRECENCY_BUCKETS[-1][0] * DAY} AND {column} != '' "
+        f"GROUP BY {column}"
+    )
+
+class History:
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._queue: queue.SimpleQueue = queue.SimpleQueue()
+        self._tokens = itertools.count(1)
+        self._writer: threading.Thread | None = None
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._schema_ready = False
+
+    # ---------------- connections ----------------
+    def _connect(self) -> sqlite3.Connection:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(self.path, timeout=5.0)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    def _ensure_schema(self) -> None:
+        with self._lock:
+            if self._schema_ready:
+                return
+            conn = self._connect()
+            with conn:
+                conn.executescript(SCHEMA)
+            conn.close()
+            self._schema_ready = True
+
+    def _reader(self) -> sqlite3.Connection:
+        # one connection per thread (sqlite3 connections are thread-bound)
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            self._ensure_schema()
+            conn = self._local.conn = self._connect()
+        return conn
+
+    # ---------------- writes (queued) ----------------
+    def _submit(self, op: tuple) -> None:
+        if self._writer is None:
+            with self._lock:
+                if self._writer is None:
+                    self._writer = threading.Thread(target=self._write_loop, name="history-writer", daemon=True)
+                    self._writer.start()
+                    atexit.register(self.flush)
+        self._queue.put(op)
+
+    def start(self, mode: str, target: str, preset: str = "", options: dict | None = None,
+              started: float | None = None) -> int:
+        """
+        Queues a launch row; returns a token for finish()/track().
+        """
+        token = next(self._tokens)
+        row = (mode, target, preset, options_hash(options or {}), started or time.time())
+        self._submit(("start", token, row))
+        return token
+
+    def finish(self, token: int, exit_code: int | None, ended: float | None = None) -> None:
+        self._submit(("end", token, ended or time.time(), exit_code))
+
+    def track(self, token: int, popen) -> None:
+        """
+        Records end time + exit code when popen exits (also reaps it).
+        """
+        def wait():
+            self.finish(token, popen.wait())
+        threading.Thread(target=wait, name=f"history-track-{token}", daemon=True).start()
+
+    def flush(self, timeout: float = 5.0) -> None:
+        """
+        Blocks until everything queued so far is committed.
+        """
+        if self._writer is None:
+            return
+        done = threading.Event()
+        self._queue.put(("flush", done))
+        done.wait(timeout)
+
+    def _write_loop(self) -> None:
+        self._ensure_schema()
+        conn = self._connect()
+        rowids: dict[int, int] = {}
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + BATCH_WINDOW_S
+            while len(batch) < BATCH_MAX and batch[-1][0] != "flush":
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            with span("history.commit", ops=len(batch)):
+                try:
+                    with conn:
+                        for op in batch:
+                            self._apply(conn, op, rowids)
+                except sqlite3.Error:
+                    pass   # history is best effort: never take the launcher down
+            for op in batch:
+                if op[0] == "flush":
+                    op[1].set()
+
+    @staticmethod
+    def _apply(conn: sqlite3.Connection, op: tuple, rowids: dict[int, int]) -> None:
+        if op[0] == "start":
+            _, token, row = op
+            cur = conn.execute(
+                "INSERT INTO launches (mode, target, preset, options_hash, start) VALUES (?, ?, ?, ?, ?)", row)
+            rowids[token] = cur.lastrowid
+        elif op[0] == "end":
+            _, token, ended, code = op
+            rowid = rowids.pop(token, None)
+            if rowid is not None:
+                conn.execute("UPDATE launches SET end = ?, exit_code = ? WHERE id = ?", (ended, code, rowid))
+        elif op[0] == "session":
+            conn.execute(
+                f"INSERT INTO sessions ({', '.join(SESSION_COLUMNS)}) "
+                f"VALUES ({', '.join('?' * len(SESSION_COLUMNS))})", op[1])
+        elif op[0] == "import":
+            conn.executemany(
+                "INSERT INTO launches (mode, target, preset, options_hash, start) VALUES (?, ?, ?, ?, ?)", op[1])
+
+    def import_rows(self, rows: list[tuple]) -> None:
+        """
+        Bulk insert of (mode, target, preset, options_hash, start) rows (older launch records).
+        """
+        if rows:
+            self._submit(("import", rows))
+
+    def add_session(self, summary: dict) -> None:
+        """
+        Queues a resource session summary (Session.summary() of lsfgvk_sampler).
+        """
+        self._submit(("session", tuple(summary.get(c, 0) for c in SESSION_COLUMNS)))
+
+    # ---------------- reads ----------------
+    def frecency(self, mode: str, by: str = "target", now: float | None = None) -> dict[str, float]:
+        """
+        {target or preset name: score} for one mode; unknown entries score 0.
+        """
+        column = "preset" if by == "preset" else "target"
+        with span("history.frecency", mode=mode, by=column):
+            try:
+                rows = self._reader().execute(_frecency_sql(column), {"mode": mode, "now": now or time.time()}).fetchall()
+            except sqlite3.Error:
+                return {}
+        return {key: float(score) for key, score in rows}
+
+    def rank(self, mode: str, keys: list[str], by: str = "target") -> list[str]:
+        """
+        keys reordered by decreasing frecency; ties keep their original (e.g. alphabetical) order.
+        """
+        scores = self.frecency(mode, by)
+        if not scores:
+            return list(keys)
+        return sorted(keys, key=lambda k: -scores.get(k, 0.0))
+
+    def top_targets(self, mode: str, limit: int = 20) -> list[str]:
+        scores = self.frecency(mode)
+        return sorted(scores, key=lambda k: -scores[k])[:limit]
+
+    def launches(self, limit: int = 100) -> list[dict]:
+        cur = self._reader().execute(
+            "SELECT mode, target, preset, options_hash, start, end, exit_code FROM launches "
+            "ORDER BY start DESC LIMIT ?", (limit,))
+        cols = [d[0] for d in cur.description]
+        return [dict(zip(cols, row)) for row in cur.fetchall()]
+
+    def sessions(self, mode: str, target: str, limit: int = 50) -> list[dict]:
+        try:
+            cur = self._reader().execute(
+                f"SELECT {', '.join(SESSION_COLUMNS)} FROM sessions WHERE mode = ? AND target = ? "
+                "ORDER BY start DESC LIMIT ?", (mode, target, limit))
+        except sqlite3.Error:
+            return []
+        return [dict(zip(SESSION_COLUMNS, row)) for row in cur.fetchall()]
+
+    def compare_presets(self, mode: str, target: str) -> list[dict]:
+        """
+        Per preset (and options hash) averages over the target's sampled sessions, most used first.
+        """
+        try:
+            cur = self._reader().execute(
+                "SELECT preset, options_hash, COUNT(*) AS sessions, SUM(duration) AS duration, "
+                "AVG(cpu_avg) AS cpu_avg, MAX(cpu_max) AS cpu_max, AVG(rss_max) AS rss_max, "
+                "AVG(threads_avg) AS threads_avg, AVG(csw_avg) AS csw_avg, AVG(agent_cpu) AS agent_cpu "
+                "FROM sessions WHERE mode = ? AND target = ? "
+                "GROUP BY preset, options_hash ORDER BY sessions DESC, preset", (mode, target))
+        except sqlite3.Error:
+            return []
+        cols = [d[0] for d in cur.description]
+        return [dict(zip(cols, row)) for row in cur.fetchall()]
@@ -0,0 +1,607 @@
+# SPDX-License-Identifier: MIT
+#
+# LSFG-VK Launcher — host /proc agent
+# - Follows a launched app's process tree on the host and reports which process loads Vulkan
+#   (its maps contain libvulkan), i.e. the real game below Steam/Lutris/wrapper scripts
+# - Incremental: children come from /proc/<pid>/task/<tid>/children of tracked pids only,
+#   exits are signalled by pidfds; no full /proc walk per tick
+#   (fallback when the kernel lacks the children file: list /proc, read stat of *new* pids only)
+# - Own CPU time is measured; the tick interval backs off to stay under --cpu-budget
+# - `sample`: per-tree CPU%, RSS, threads, context switches and I/O rates from /proc/<pid>/stat,
+#   status (per thread) and io; the files stay open and are re-read with pread()
+#
+# Self-contained (stdlib only): the sandbox cannot see host processes, so the app ships this
+# file's source to the host with `flatpak-spawn --host python3 -c <source> watch --root PID`
+# and reads JSON lines from stdout. Nothing here may import other lsfgvk_* modules at top level.
+# It runs under the *host's* python3 (3.8 on Ubuntu 20.04, 3.9 on Debian 11 / EL9): the
+# annotations below are only valid at runtime from 3.10, hence the __future__ import.
+
+from __future__ import annotations
+
+import os
+import sys
+import json
+import time
+import select
+import argparse
+
+# Launchers/helpers that load Vulkan themselves but are never the game
+IGNORED_NAMES = {"steam", "steamwebhelper", "gamescope", "lutris", "heroic", "wineserver", "explorer.exe", "services.exe"}
+
+# ---------------- /proc helpers ----------------
+
+def read_stat(pid: int) -> tuple[int, int] | None:
+    """(ppid, start_time) from /proc/<pid>/stat, None if the process is gone or a zombie."""
+    try:
+        with open(f"/proc/{pid}/stat", "rb") as f:
+            data = f.read()
+    except OSError:
+        return None
+    # comm may contain spaces/parentheses: fields start after the last ')'
+    fields = data[data.rindex(b")") + 2:].split()
+    if fields[0] in (b"Z", b"X"):
+        return None
+    return int(fields[1]), int(fields[19])
+
+def process_name(pid: int) -> str:
+    """
+    Name as lsfg-vk sees it: basename of argv[0] (Windows paths too, for Wine/Proton), else comm.
+    """
+    try:
+        with open(f"/proc/{pid}/cmdline", "rb") as f:
+            argv0 = f.read().split(b"\0", 1)[0].decode(errors="replace")
+    except OSError:
+        argv0 = ""
+    name = argv0.replace("\\", "/").rsplit("/", 1)[-1]
+    if name:
+        return name
+    try:
+        with open(f"/proc/{pid}/comm", "rb") as f:
+            return f.read().decode(errors="replace").strip()
+    except OSError:
+        return ""
+
+def maps_contain(pid: int, needle: bytes) -> bool:
+    try:
+        with open(f"/proc/{pid}/maps", "rb") as f:
+            while True:
+                chunk = f.read(65536)
+                if not chunk:
+                    return False
+                if needle in chunk:
+                    return True
+    except OSError:
+        return False
+
+def _task_children(pid: int) -> list[int] | None:
+    """Children of every thread of pid; None if the kernel has no children file."""
+    try:
+        tids = os.listdir(f"/proc/{pid}/task")
+    except OSError:
+        return []
+    out: list[int] = []
+    for tid in tids:
+        try:
+            with open(f"/proc/{pid}/task/{tid}/children", "rb") as f:
+                out.extend(int(x) for x in f.read().split())
+        except FileNotFoundError:
+            if os.path.isdir(f"/proc/{pid}/task/{tid}"):
+                return None   # kernel built without CONFIG_PROC_CHILDREN
+        except OSError:
+            continue
+    return out
+
+# ---------------- Process tree ----------------
+
+class ProcTree:
+    """
+    Tracks root_pid and its descendants. tick() returns (spawned, exited) pid lists.
+    """
+
+    def __init__(self, root_pid: int):
+        self.root = root_pid
+        self.pids: dict[int, int] = {}        # pid -> start_time (guards against pid reuse)
+        self.parents: dict[int, int] = {}     # pid -> ppid
+        self._pidfds: dict[int, int] = {}     # pid -> pidfd
+        self._fd_pid: dict[int, int] = {}     # pidfd -> pid
+        self._poll = select.poll()
+        self._use_children = True
+        self._scan_seen: dict[int, int] = {}  # fallback: pid -> ppid of non-members already looked at
+        st = read_stat(root_pid)
+        if st is not None:
+            self._add(root_pid, st[0], st[1])
+
+    # ---- membership
+    def _add(self, pid: int, ppid: int, start: int) -> None:
+        self.pids[pid] = start
+        self.parents[pid] = ppid
+        if hasattr(os, "pidfd_open"):
+            try:
+                fd = os.pidfd_open(pid)
+            except OSError:
+                return
+            self._pidfds[pid] = fd
+            self._fd_pid[fd] = pid
+            self._poll.register(fd, select.POLLIN)
+
+    def _remove(self, pid: int) -> None:
+        self.pids.pop(pid, None)
+        self.parents.pop(pid, None)
+        fd = self._pidfds.pop(pid, None)
+        if fd is not None:
+            self._fd_pid.pop(fd, None)
+            self._poll.unregister(fd)
+            os.close(fd)
+
+    def close(self) -> None:
+        for pid in list(self.pids):
+            self._remove(pid)
+
+    @property
+    def alive(self) -> bool:
+        return bool(self.pids)
+
+    # ---- waiting
+    def wait(self, timeout_s: float) -> None:
+        """Sleeps up to timeout_s, waking early when a tracked process exits (pidfd readable)."""
+        if self._pidfds:
+            self._poll.poll(max(0, int(timeout_s * 1000)))
+        else:
+            time.sleep(timeout_s)
+
+    # ---- update
+    def tick(self) -> tuple[list[int], list[int]]:
+        exited = self._reap()
+        if self._use_children:
+            spawned = self._discover_children()
+        else:
+            spawned = self._discover_scan()
+        return spawned, exited
+
+    def _reap(self) -> list[int]:
+        gone = []
+        if self._pidfds:
+            for fd, _ev in self._poll.poll(0):
+                pid = self._fd_pid.get(fd)
+                if pid is not None:
+                    gone.append(pid)
+        for pid in list(self.pids):
+            if pid in gone or pid in self._pidfds:
+                continue
+            st = read_stat(pid)   # no pidfd for this one: check it is still the same process
+            if st is None or st[1] != self.pids[pid]:
+                gone.append(pid)
+        for pid in gone:
+            self._remove(pid)
+        return gone
+
+    def _discover_children(self) -> list[int]:
+        new = []
+        for pid in list(self.pids):
+            kids = _task_children(pid)
+            if kids is None:
+                self._use_children = False
+                return self._discover_scan()
+            for child in kids:
+                if child in self.pids:
+                    continue
+                st = read_stat(child)
+                if st is not None:
+                    self._add(child, st[0], st[1])
+                    new.append(child)
+        return new
+
+    def _discover_scan(self) -> list[int]:
+        # Fallback: only pids not seen before get their stat read.
+        new = []
+        listing = {int(e) for e in os.listdir("/proc") if e.isdigit()}
+        for pid in list(self._scan_seen):
+            if pid not in listing:
+                del self._scan_seen[pid]
+        for pid in sorted(listing):   # parents usually have lower pids than their children
+            if pid in self.pids or pid in self._scan_seen:
+                continue
+            st = read_stat(pid)
+            if st is None:
+                continue
+            if st[0] in self.pids:
+                self._add(pid, st[0], st[1])
+                new.append(pid)
+            else:
+                self._scan_seen[pid] = st[0]
+        return new
+
+# ---------------- CPU budget ----------------
+
+class CpuBudget:
+    """
+    Measures the agent's own CPU time; interval() doubles the tick interval while over
+    budget and recovers towards the requested one once well under it.
+    """
+
+    def __init__(self, interval: float, budget_pct: float, window_s: float = 2.0, max_interval: float = 5.0):
+        self.base = self.current = interval
+        self.budget = budget_pct
+        self.window = window_s
+        self.max_interval = max(max_interval, interval)
+        self.t_start = self._win_wall = time.monotonic()
+        self.cpu_start = self._win_cpu = time.process_time()
+
+    def interval(self) -> float:
+        now = time.monotonic()
+        if now - self._win_wall >= self.window:
+            cpu = time.process_time()
+            pct = 100.0 * (cpu - self._win_cpu) / (now - self._win_wall)
+            if pct > self.budget:
+                self.current = min(self.current * 2, self.max_interval)
+            elif pct < self.budget / 4 and self.current > self.base:
+                self.current = max(self.base, self.current / 2)
+            self._win_wall, self._win_cpu = now, cpu
+        return self.current
+
+    def cpu_pct(self) -> float:
+        """Average own CPU% since start."""
+        wall = max(1e-6, time.monotonic() - self.t_start)
+        return 100.0 * (time.process_time() - self.cpu_start) / wall
+
+# ---------------- watch command ----------------
+
+def _emit(obj: dict) -> None:
+    sys.stdout.write(json.dumps(obj) + "\n")
+    sys.stdout.flush()
+
+class VulkanProbe:
+    """
+    Re-checks members' maps for libvulkan with exponential backoff (Vulkan is loaded a while
+    after exec, but re-reading big maps files every tick would dominate the agent's cost).
+    """
+
+    def __init__(self, max_every: int = 16):
+        self.max_every = max_every
+        self._next: dict[int, tuple[int, int]] = {}   # pid -> (next tick, current step)
+        self.found: set[int] = set()
+
+    def forget(self, pid: int) -> None:
+        self._next.pop(pid, None)
+
+    def check(self, tick: int, pids) -> list[int]:
+        hits = []
+        for pid in pids:
+            if pid in self.found:
+                continue
+            due, step = self._next.get(pid, (tick, 1))
+            if tick < due:
+                continue
+            if maps_contain(pid, b"libvulkan"):
+                self.found.add(pid)
+                self._next.pop(pid, None)
+                hits.append(pid)
+            else:
+                step = min(self.max_every, step * 2)
+                self._next[pid] = (tick + step, step)
+        return hits
+
+def watch(root_pid: int, interval: float, cpu_budget: float, timeout: float, until_vulkan: bool) -> int:
+    tree = ProcTree(root_pid)
+    if not tree.alive:
+        _emit({"ev": "done", "reason": "no-such-process"})
+        return 1
+    probe = VulkanProbe()
+    budget = CpuBudget(interval, cpu_budget)
+    last_stats = budget.t_start
+    ticks = 0
+    reason = "timeout"
+    _emit({"ev": "spawn", "pid": root_pid, "ppid": tree.parents.get(root_pid, 0), "name": process_name(root_pid)})
+    try:
+        while time.monotonic() - budget.t_start < timeout:
+            ticks += 1
+            spawned, exited = tree.tick()
+            for pid in spawned:
+                _emit({"ev": "spawn", "pid": pid, "ppid": tree.parents.get(pid, 0), "name": process_name(pid)})
+            for pid in exited:
+                probe.forget(pid)
+                _emit({"ev": "exit", "pid": pid})
+            if not tree.alive:
+                reason = "exited"
+                break
+            hit_game = False
+            for pid in probe.check(ticks, list(tree.pids)):
+                name = process_name(pid)
+                ignored = name.lower() in IGNORED_NAMES
+                _emit({"ev": "vulkan", "pid": pid, "name": name, "ignored": ignored})
+                hit_game = hit_game or not ignored
+            if hit_game and until_vulkan:
+                reason = "vulkan"
+                break
+
+            # CPU budget: back off when over, recover towards the requested interval when well under
+            interval = budget.interval()
+            now = time.monotonic()
+            if now - last_stats >= 5.0:
+                last_stats = now
+                _emit(_stats(budget, ticks, tree))
+            tree.wait(interval)
+    finally:
+        _emit(_stats(budget, ticks, tree))
+        _emit({"ev": "done", "reason": reason})
+        tree.close()
+    return 0
+
+def _stats(budget: CpuBudget, ticks: int, tree: ProcTree) -> dict:
+    return {
+        "ev": "stats",
+        "ticks": ticks,
+        "interval": budget.current,
+        "tracked": len(tree.pids),
+        "cpu_pct": round(budget.cpu_pct(), 4),
+        "incremental": tree._use_children,
+    }
+
+# ---------------- sample command ----------------
+
+CLK_TCK = os.sysconf("SC_CLK_TCK")
+PAGE_SIZE = os.sysconf("SC_PAGE_SIZE")
+MAX_OPEN_FILES = 512    # above this, /proc files are opened per read instead of kept open
+TASK_RESCAN = 8         # re-list /proc/<pid>/task at least every N samples (else only when the thread count changes)
+
+def _counter(data: bytes, label: bytes) -> int:
+    """Value of a "label:   N" line in /proc status/io text (label includes the leading newline)."""
+    i = data.find(label)
+    if i < 0:
+        return 0
+    i += len(label)
+    j = data.find(b"\n", i)
+    return int(data[i:j if j >= 0 else len(data)])
+
+class TreeSampler:
+    """
+    Tree-wide resource counters. Cumulative counters (CPU ticks, context switches, I/O bytes)
+    are diffed per pid/tid, so processes and threads that appear between two samples count
+    from zero and those that exit do not make the totals go backwards.
+    """
+
+    def __init__(self):
+        self._fds: dict[int, dict[str, int]] = {}   # pid -> {relative path: fd}
+        self._open = 0
+        self._prev: dict[tuple, int] = {}
+        self._last: float | None = None
+        self._tasks: dict[int, tuple[int, int, list[str]]] = {}   # pid -> (thread count, sample no., status paths)
+        self._count = 0
+
+    def _read(self, pid: int, rel: str, size: int = 4096) -> bytes | None:
+        files = self._fds.setdefault(pid, {})
+        fd = files.get(rel)
+        path = f"/proc/{pid}/{rel}"
+        if fd is None:
+            if self._open >= MAX_OPEN_FILES:
+                try:
+                    with open(path, "rb") as f:
+                        return f.read(size)
+                except OSError:
+                    return None
+            try:
+                fd = os.open(path, os.O_RDONLY | os.O_CLOEXEC)
+            except OSError:
+                return None
+            files[rel] = fd
+            self._open += 1
+        try:
+            return os.pread(fd, size, 0)
+        except OSError:
+            # thread or process gone (ESRCH)
+            del files[rel]
+            self._open -= 1
+            os.close(fd)
+            return None
+
+    def forget(self, pid: int) -> None:
+        self._tasks.pop(pid, None)
+        for fd in self._fds.pop(pid, {}).values():
+            os.close(fd)
+            self._open -= 1
+
+    def close(self) -> None:
+        for pid in list(self._fds):
+            self.forget(pid)
+
+    def _delta(self, cur: dict, key: tuple, value: int) -> int:
+        cur[key] = value
+        prev = self._prev.get(key)
+        if prev is None:
+            return value if self._last is not None else 0   # first sample only sets the baseline
+        return value - prev if value >= prev else value
+
+    def _task_status(self, pid: int, nthreads: int) -> list[str]:
+        """status paths of pid's threads; the task dir is only re-listed when needed."""
+        known = self._tasks.get(pid)
+        if known is not None and known[0] == nthreads and self._count - known[1] < TASK_RESCAN:
+            return known[2]
+        try:
+            rels = [f"task/{tid}/status" for tid in os.listdir(f"/proc/{pid}/task")]
+        except OSError:
+            rels = []
+        files = self._fds.get(pid, {})
+        live = set(rels)
+        for rel in [r for r in files if r.startswith("task/") and r not in live]:
+            os.close(files.pop(rel))
+            self._open -= 1
+        self._tasks[pid] = (nthreads, self._count, rels)
+        return rels
+
+    def sample(self, pids) -> dict | None:
+        """One tree-wide sample; None for the first call (baseline) or a zero-length interval."""
+        now = time.monotonic()
+        cur: dict[tuple, int] = {}
+        ticks = vcs = ivcs = io_r = io_w = 0
+        rss = threads = procs = 0
+        for pid in list(pids):
+            st = self._read(pid, "stat")
+            if not st:
+                continue
+            f = st[st.rindex(b")") + 2:].split()
+            procs += 1
+            threads += int(f[17])
+            rss += int(f[21])
+            ticks += self._delta(cur, (pid, "cpu"), int(f[11]) + int(f[12]))
+            io = self._read(pid, "io")
+            if io:
+                io_r += self._delta(cur, (pid, "r"), _counter(io, b"\nread_bytes: "))
+                io_w += self._delta(cur, (pid, "w"), _counter(io, b"\nwrite_bytes: "))
+            # context switches are per thread in status: one small file per task
+            for rel in self._task_status(pid, int(f[17])):
+                status = self._read(pid, rel, 8192)
+                if status:
+                    vcs += self._delta(cur, (pid, rel, "v"), _counter(status, b"\nvoluntary_ctxt_switches:\t"))
+                    ivcs += self._delta(cur, (pid, rel, "i"), _counter(status, b"\nnonvoluntary_ctxt_switches:\t"))
+        self._count += 1
+        first, dt = self._last is None, now - (self._last or now)
+        self._prev, self._last = cur, now
+        if first or dt <= 0:
+            return None
+        return {
+            "ev": "sample",
+            "cpu": round(100.0 * ticks / CLK_TCK / dt, 2),     # % of one core (can exceed 100)
+            "rss": rss * PAGE_SIZE,                            # bytes, summed over the tree
+            "threads": threads,
+            "csw": round((vcs + ivcs) / dt, 1),                # context switches per second
+            "ivcsw": round(ivcs / dt, 1),                      # … of which involuntary (preempted)
+            "io_r": round(io_r / dt),                          # storage bytes read / written per second
+            "io_w": round(io_w / dt),
+            "procs": procs,
+        }
+
+def sample(root_pid: int, interval: float, cpu_budget: float, timeout: float) -> int:
+    tree = ProcTree(root_pid)
+    if not tree.alive:
+        _emit({"ev": "done", "reason": "no-such-process"})
+        return 1
+    sampler = TreeSampler()
+    budget = CpuBudget(interval, cpu_budget, window_s=max(2.0, 4 * interval), max_interval=8 * interval)
+    last_stats = budget.t_start
+    ticks = 0
+    reason = "timeout"
+    try:
+        while time.monotonic() - budget.t_start < timeout:
+            ticks += 1
+            _spawned, exited = tree.tick()
+            for pid in exited:
+                sampler.forget(pid)
+            if not tree.alive:
+                reason = "exited"
+                break
+            ev = sampler.sample(tree.pids)
+            interval = budget.interval()
+            if ev is not None:
+                ev["t"] = round(time.monotonic() - budget.t_start, 3)
+                ev["interval"] = interval
+                _emit(ev)
+            if time.monotonic() - last_stats >= 5.0:
+                last_stats = time.monotonic()
+                _emit(_stats(budget, ticks, tree))
+            time.sleep(interval)   # not tree.wait(): an early wake-up would shorten the sample
+    finally:
+        _emit(_stats(budget, ticks, tree))
+        _emit({"ev": "done", "reason": reason})
+        sampler.close()
+        tree.close()
+    return 0
+
+def main(argv: list[str] | None = None) -> int:
+    ap = argparse.ArgumentParser(prog="lsfgvk-hostagent")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    w = sub.add_parser("watch", help="follow a process tree, report Vulkan-loading processes")
+    w.add_argument("--root", type=int, required=True)
+    w.add_argument("--interval", type=float, default=0.25)
+    w.add_argument("--cpu-budget", type=float, default=1.0, help="max agent CPU %% before backing off")
+    w.add_argument("--timeout", type=float, default=600.0)
+    w.add_argument("--until-vulkan", action="store_true", help="stop at the first non-ignored Vulkan process")
+    sm = sub.add_parser("sample", help="sample CPU/RSS/threads/context switches/IO of a process tree")
+    sm.add_argument("--root", type=int, required=True)
+    sm.add_argument("--interval", type=float, default=1.0)
+    sm.add_argument("--cpu-budget", type=float, default=0.5, help="max agent CPU %% before sampling less often")
+    sm.add_argument("--timeout", type=float, default=12 * 3600.0)
+    args = ap.parse_args(argv)
+    if args.cmd == "watch":
+        return watch(args.root, args.interval, args.cpu_budget, args.timeout, args.until_vulkan)
+    if args.cmd == "sample":
+        return sample(args.root, args.interval, args.cpu_budget, args.timeout)
+    return 2
+
+# ---------------- App side ----------------
+
+def agent_cmd(args: list[str]) -> list[str]:
+    """
+    Command running this module on the host (python3 >= 3.7, part of every desktop distro).
+    """
+    with open(__file__, encoding="utf-8") as f:
+        source = f.read()
+    return ["flatpak-spawn", "--host", "python3", "-u", "-c", source] + args
+
+def stream_agent(args: list[str], on_event, stop=None) -> int:
+    """
+    Runs the agent and calls on_event(dict) per JSON line (blocking; use from a worker thread).
+    stop: optional threading.Event that terminates the agent early.
+    When the agent cannot start or fails (no python3 on the host, a crash…), a last
+    {"ev": "error", "rc", "message"} event carries its exit status and last stderr line.
+    """
+    import subprocess
+    import threading
+    from collections import deque
+
+    try:
+        proc = subprocess.Popen(agent_cmd(args), stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+    except OSError as e:
+        on_event({"ev": "error", "rc": 127, "message": str(e)})
+        return 127
+    # drained on its own thread: a chatty stderr must not block the agent's stdout
+    tail: deque = deque(maxlen=20)
+    drain = threading.Thread(target=lambda: tail.extend(proc.stderr), daemon=True)
+    drain.start()
+    if stop is not None:
+        def killer():
+            stop.wait()
+            if proc.poll() is None:
+                proc.terminate()
+        threading.Thread(target=killer, daemon=True).start()
+    for line in proc.stdout:
+        try:
+            ev = json.loads(line)
+        except ValueError:
+            continue
+        on_event(ev)
+    rc = proc.wait()
+    drain.join(timeout=1.0)
+    if rc != 0 and not (stop is not None and stop.is_set()):
+        lines = [ln.strip() for ln in tail if ln.strip()]
+        on_event({"ev": "error", "rc": rc, "message": lines[-1] if lines else f"exit status {rc}"})
+    return rc
+
+def watch_for_vulkan(root_pid: int, on_found, on_done=None, timeout: float = 600.0):
+    """
+    Starts a background watcher; on_found(name, pid) is called (worker thread) for the first
+    non-ignored Vulkan process, on_done(stats_dict) when the agent stops; stats_dict["error"]
+    is set when the agent failed.
+    """
+    import threading
+
+    def run():
+        stats: dict = {}
+
+        def on_event(ev: dict) -> None:
+            if ev.get("ev") == "vulkan" and not ev.get("ignored"):
+                on_found(ev.get("name", ""), ev.get("pid"))
+            elif ev.get("ev") == "stats":
+                stats.update(ev)
+            elif ev.get("ev") == "error":
+                stats["error"] = ev.get("message", "")
+
+        stream_agent(["watch", "--root", str(root_pid), "--until-vulkan", "--timeout", str(timeout)], on_event)
+        if on_done:
+            on_done(stats)
+
+    t = threading.Thread(target=run, name=f"procwatch-{root_pid}", daemon=True)
+    t.start()
+    return t
+
+if __name__ == "__main__":
+    sys.exit(main())
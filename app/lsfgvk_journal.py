@@ -0,0 +1,254 @@
+# SPDX-License-Identifier: MIT
+#
+# LSFG-VK Launcher — append-only journal store
+# - State is {kind: {key: value}} (favorites, launch groups, launch records…)
+# - Every mutation is one appended JSON line with a CRC32: O(1) whatever the number of presets
+# - Startup = snapshot + replay of the journal tail (records newer than the snapshot)
+# - When the journal outgrows the snapshot (ratio), a background thread writes a new snapshot
+#   atomically and drops the records it now contains
+#
+# Files: <name>.snapshot.json and <name>.journal.jsonl in the config dir.
+# Journal line:  {"c":<crc32 of R>,"r":R}  with R = {"s":seq,"op":"put|del|reset","k":kind,"id":key,"v":value}
+# Snapshot:      {"seq":N,"crc":<crc32 of S>}\n S   (S = state JSON; the checksum covers the raw bytes)
+
+import os
+import json
+import zlib
+import threading
+from pathlib import Path
+
+from lsfgvk_trace import span, traced
+
+def _dumps(obj) -> bytes:
+    return json.dumps(obj, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+def _parse_line(line: bytes) -> dict:
+    """Raises ValueError on a damaged record."""
+    if not line.startswith(b'{"c":') or not line.endswith(b"}\n"):
+        raise ValueError("malformed record")
+    j = line.index(b',"r":')
+    payload = line[j + 5:-2]
+    if zlib.crc32(payload) != int(line[5:j]):
+        raise ValueError("checksum mismatch")
+    return json.loads(payload)
+
+class Journal:
+    """
+    caps: kinds that only keep their most recent N entries (e.g. {"launch": 500});
+    older ones are dropped from memory right away and from disk at the next compaction.
+    """
+
+    def __init__(self, directory: Path, name: str = "store", compact_ratio: float = 2.0,
+                 min_compact_bytes: int = 64 * 1024, caps: dict[str, int] | None = None):
+        self.directory = Path(directory)
+        self.snapshot_path = self.directory / f"{name}.snapshot.json"
+        self.journal_path = self.directory / f"{name}.journal.jsonl"
+        self.compact_ratio = compact_ratio
+        self.min_compact_bytes = min_compact_bytes
+        self.caps = caps or {}
+        self.state: dict[str, dict] = {}
+        self.seq = 0
+        self.skipped = 0                  # corrupt/torn records ignored during the last load
+        self._lock = threading.RLock()
+        self._fh = None
+        self._journal_bytes = 0
+        self._snapshot_bytes = 0
+        self._compactor: threading.Thread | None = None
+        self._compact_lock = threading.Lock()   # one compaction at a time (background or explicit)
+
+    # ---------------- loading ----------------
+    def exists(self) -> bool:
+        return self.snapshot_path.exists() or self.journal_path.exists()
+
+    @traced("journal.load")
+    def load(self) -> "Journal":
+        with self._lock:
+            self._close()
+            self.state, self.seq, self.skipped = {}, 0, 0
+            self._load_snapshot()
+            self._replay_tail()
+            self._open()
+        self._maybe_compact()
+        return self
+
+    def _load_snapshot(self) -> None:
+        try:
+            raw = self.snapshot_path.read_bytes()
+        except FileNotFoundError:
+            return
+        self._snapshot_bytes = len(raw)
+        try:
+            header, _, body = raw.partition(b"\n")
+            doc = json.loads(header)
+            if zlib.crc32(body) != doc.get("crc"):
+                raise ValueError("snapshot checksum mismatch")
+            state = json.loads(body)
+        except ValueError:
+            # keep the damaged file around for inspection, replay whatever the journal has
+            self.snapshot_path.replace(self.snapshot_path.with_suffix(".json.corrupt"))
+            self._snapshot_bytes = 0
+            self.skipped += 1
+            return
+        self.state = state
+        self.seq = int(doc.get("seq", 0))
+
+    def _replay_tail(self) -> None:
+        try:
+            fh = open(self.journal_path, "rb")
+        except FileNotFoundError:
+            return
+        good_end = 0
+        with fh, span("journal.replay") as sp:
+            replayed = 0
+            for line in fh:
+                if not line.endswith(b"\n"):
+                    break   # torn last write: truncated below
+                good_end += len(line)
+                try:
+                    rec = _parse_line(line)
+                    seq, op, kind = rec["s"], rec["op"], rec["k"]
+                except (ValueError, KeyError, TypeError):
+                    self.skipped += 1
+                    continue
+                if seq <= self.seq:
+                    continue   # already folded into the snapshot
+                self._apply(op, kind, rec.get("id"), rec.get("v"))
+                self.seq = seq
+                replayed += 1
+            sp.set(records=replayed)
+        size = self.journal_path.stat().st_size
+        if size != good_end:
+            with open(self.journal_path, "r+b") as f:
+                f.truncate(good_end)
+        self._journal_bytes = good_end
+
+    # ---------------- mutations ----------------
+    def _apply(self, op: str, kind: str, key, value) -> None:
+        if op == "put":
+            bucket = self.state.setdefault(kind, {})
+            bucket[key] = value
+            cap = self.caps.get(kind)
+            if cap and len(bucket) > cap:
+                for old in list(bucket)[: len(bucket) - cap]:
+                    del bucket[old]
+        elif op == "del":
+            self.state.get(kind, {}).pop(key, None)
+        elif op == "reset":
+            self.state[kind] = dict(value or {})
+
+    def _append(self, op: str, kind: str, key, value) -> None:
+        with self._lock:
+            self.seq += 1
+            payload = _dumps({"s": self.seq, "op": op, "k": kind, "id": key, "v": value})
+            data = b'{"c":%d,"r":%s}\n' % (zlib.crc32(payload), payload)
+            if self._fh is None:
+                self._open()
+            self._fh.write(data)
+            self._fh.flush()
+            self._journal_bytes += len(data)
+            self._apply(op, kind, key, value)
+        self._maybe_compact()
+
+    @traced("journal.put")
+    def put(self, kind: str, key: str, value) -> None:
+        self._append("put", kind, key, value)
+
+    @traced("journal.delete")
+    def delete(self, kind: str, key: str) -> None:
+        if key in self.state.get(kind, {}):
+            self._append("del", kind, key, None)
+
+    def reset(self, kind: str, items: dict) -> None:
+        """Replaces a whole kind in one record (import / reset)."""
+        self._append("reset", kind, None, items)
+
+    def items(self, kind: str) -> dict:
+        return self.state.get(kind, {})
+
+    # ---------------- compaction ----------------
+    def _needs_compaction(self) -> bool:
+        return self._journal_bytes > self.compact_ratio * max(self._snapshot_bytes, self.min_compact_bytes)
+
+    def _maybe_compact(self) -> None:
+        if not self._needs_compaction():
+            return
+        with self._lock:
+            if self._compactor is not None and self._compactor.is_alive():
+                return
+            self._compactor = threading.Thread(target=self.compact, name="journal-compact", daemon=True)
+            self._compactor.start()
+
+    def wait_compaction(self, timeout: float | None = None) -> None:
+        t = self._compactor
+        if t is not None:
+            t.join(timeout)
+
+    @traced("journal.compact")
+    def compact(self) -> None:
+        with self._compact_lock:
+            self._compact()
+
+    def _compact(self) -> None:
+        # 1. freeze the state under the lock (cheap: one serialization)
+        with self._lock:
+            seq = self.seq
+            body = _dumps(self.state)
+        # 2. write the snapshot without blocking appends
+        data = _dumps({"seq": seq, "crc": zlib.crc32(body)}) + b"\n" + body
+        self.directory.mkdir(parents=True, exist_ok=True)
+        tmp = self.snapshot_path.with_suffix(".json.tmp")
+        with open(tmp, "wb") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self.snapshot_path)
+        # 3. keep only records appended meanwhile (seq > snapshot seq)
+        with self._lock:
+            self._close()
+            tail = []
+            try:
+                with open(self.journal_path, "rb") as f:
+                    for line in f:
+                        try:
+                            if _parse_line(line)["s"] > seq:
+                                tail.append(line)
+                        except (ValueError, KeyError, TypeError):
+                            continue
+            except FileNotFoundError:
+                pass
+            jtmp = self.journal_path.with_suffix(".jsonl.tmp")
+            with open(jtmp, "wb") as f:
+                f.writelines(tail)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(jtmp, self.journal_path)
+            self._snapshot_bytes = len(data)
+            self._journal_bytes = sum(len(x) for x in tail)
+            self._open()
+
+    # ---------------- files ----------------
+    def _open(self) -> None:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._fh = open(self.journal_path, "ab")
+
+    def _close(self) -> None:
+        if self._fh is not None:
+            self._fh.close()
+            self._fh = None
+
+    def close(self) -> None:
+        self.wait_compaction()
+        with self._lock:
+            self._close()
+
+    def destroy(self) -> None:
+        """Deletes both files (settings reset)."""
+        self.close()
+        with self._lock:
+            for p in (self.snapshot_path, self.journal_path):
+                try:
+                    p.unlink()
+                except FileNotFoundError:
+                    pass
+            self.state, self.seq = {}, 0
+            self._journal_bytes = self._snapshot_bytes = 0
@@ -5,26 +5,38 @@
 # - Flatpak + Host launchers with lsfg-vk and optional MangoHud
 # - Uses flatpak-spawn --host for all host interactions
 # - Options inline per page, persistence in ~/.var/app/<APPID>/config/settings.json
+# - Settings model, host helpers and command building live in lsfgvk_core.py (no GTK)
+# - Optional span tracing of hot paths (LSFGVK_TRACE=1 or menu), see lsfgvk_trace.py
 #
 # Note: no 'List'/'Tuple' from typing to avoid NameError: use built-in generics.
 
-import os
 import json
 import shlex
+import argparse
 import subprocess
-from dataclasses import dataclass, asdict, field
-from pathlib import Path
+from collections.abc import Iterator
+from dataclasses import dataclass, asdict
 
 import gi
 gi.require_version("Gtk", "4.0")
 gi.require_version("Adw", "1")
 from gi.repository import Gtk, Adw, Gio, GLib
 
-APP_ID = "io.reaven.LSFGVKLauncher"
-
-CONFIG_DIR = Path(GLib.get_user_config_dir()) / "lsfgvk-launcher"
-CONFIG_DIR.mkdir(parents=True, exist_ok=True)
-CONFIG_FILE = CONFIG_DIR / "settings.json"
+from lsfgvk_trace import TRACER, span, traced
+from lsfgvk_core import (
+    APP_ID, CONFIG_DIR, CONFIG_FILE, TRACE_DIR, MULTIPLIERS,
+    Options, Settings, settings_from_dict, load_settings, save_settings,
+    store, replace_collections, put_favorite, remove_favorite, put_group, remove_group, record_launch,
+    put_rule, remove_rule, rule_key, history,
+    run_host, host_has_flatpak, list_flatpaks,
+    build_env, env_to_flatpak_args, env_prefix_shell, split_args, flatpak_launch_cmd, host_launch_cmd,
+    spawn_host, run_favorite,
+)
+from lsfgvk_rules import FIELDS, KINDS, Rule, rule_from_dict, rule_to_dict, validate_rule, resolve_profile, launch_target
+from lsfgvk_groups import (
+    READY_MODES, GroupMember, LaunchGroup, GroupRun,
+    group_from_dict, group_to_dict, validate_group, run_group,
+)
 
 # ---------------- i18n (very lightweight) ----------------
 
@@ -80,9 +92,88 @@ _STRINGS = {
         "no_selection": "No Flatpak application selected.",
         "export_done": "Settings exported.",
         "import_done": "Settings imported.",
+        "export_launchers": "Export favorites as launchers",
+        "verify_launchers": "Verify exported launchers",
+        "launchers_done": "Launchers exported: {written} written, {unchanged} unchanged, {removed} removed.\nScripts and .desktop files are kept in sync with your favorites from now on.",
+        "launchers_ok": "Every exported launcher runs exactly what the launcher would.",
+        "launchers_bad": "Exported launchers that differ from the launcher:",
         "reset_done": "Settings reset.",
         "fav_saved": "Favorite saved.",
         "fav_exists": "Preset already exists (overwritten).",
+        "diagnostics": "Diagnostics",
+        "trace_record": "Record trace",
+        "trace_export": "Export trace",
+        "trace_exported": "Trace exported (open the .json in ui.perfetto.dev or chrome://tracing).",
+        "trace_empty": "No spans recorded yet. Enable \"Record trace\" and reproduce the issue first.",
+        "tab_groups": "Groups",
+        "grp_editor": "Launch group",
+        "grp_name": "Group name",
+        "grp_parallel": "Simultaneous start-ups",
+        "grp_add_member": "Add member",
+        "grp_member_fav": "Favorite",
+        "grp_delay": "Delay before start (s)",
+        "grp_after_prev": "Wait until the previous member is ready",
+        "grp_after": "after",
+        "grp_ready": "Ready when",
+        "ready_start": "Started",
+        "ready_seconds": "Timeout elapsed",
+        "ready_window": "Window appears",
+        "grp_ready_timeout": "Ready timeout (s)",
+        "grp_members": "Members",
+        "grp_saved_list": "Saved groups",
+        "grp_save": "Save group",
+        "grp_saved": "Launch group saved.",
+        "grp_empty": "Add at least one member.",
+        "grp_status": "Status",
+        "grp_done": "all members started",
+        "grp_state_waiting": "waiting",
+        "grp_state_starting": "starting",
+        "grp_state_started": "started",
+        "grp_state_ready": "ready",
+        "grp_state_failed": "failed",
+        "grp_state_skipped": "skipped",
+        "detect_process": "Detect LSFG_PROCESS after launch",
+        "detect_process_hint": "Follows the launched processes and finds the one that loads Vulkan",
+        "detect_found": "The process that loaded Vulkan is “{name}”. Use it as LSFG_PROCESS?",
+        "detect_save_fav": "It will also be saved in the favorite “{fav}”.",
+        "detect_use": "Use",
+        "detect_failed": "Detection failed on the host: {error}",
+        "monitor": "Sample resources while running",
+        "monitor_hint": "CPU, memory, threads and context switches of the launched processes",
+        "monitor_interval": "Sampling interval (s)",
+        "monitor_title": "Resources",
+        "monitor_idle": "Launch with “Sample resources while running” to see live graphs.",
+        "monitor_running": "{target} — sampling every {interval:.2g} s, sampler CPU {agent:.2f} %",
+        "monitor_ended": "{target} — ended after {duration:.0f} s ({samples} samples), sampler CPU {agent:.2f} %",
+        "monitor_no_pid": "Could not get the host process id: resource sampling is unavailable.",
+        "monitor_failed": "{target} — the sampler failed on the host after {samples} samples: {error}",
+        "metric_cpu": "CPU",
+        "metric_rss": "Memory (RSS)",
+        "metric_threads": "Threads",
+        "metric_csw": "Context switches",
+        "monitor_compare": "Compare presets",
+        "monitor_compare_title": "Sessions of {target}",
+        "monitor_compare_empty": "No sampled session for this target yet.",
+        "recent_cmds": "Recent commands",
+        "recent_use": "Use",
+        "tab_rules": "Rules",
+        "rule_editor": "Auto-profile rule",
+        "rule_editor_hint": "Selecting or launching a matching target applies the favorite's options",
+        "rule_field": "Match on",
+        "rule_field_flatpak": "Flatpak app id",
+        "rule_field_host": "Host command",
+        "rule_field_steam": "Steam appid",
+        "rule_field_process": "LSFG_PROCESS",
+        "rule_kind": "Pattern type",
+        "rule_kind_glob": "Glob (whole value, * ? [ ])",
+        "rule_kind_regex": "Regular expression (anywhere)",
+        "rule_pattern": "Pattern",
+        "rule_priority": "Priority (higher wins)",
+        "rule_add": "Add rule",
+        "rule_list": "Rules",
+        "rule_no_fav": "Save a favorite first.",
+        "auto_profile": "Auto-profile",
+        "auto_none": "No matching rule",
     },
     "fr": {
         "app_title": "LSFG-VK Launcher",
@@ -135,113 +226,147 @@ _STRINGS = {
         "no_selection": "Aucune application Flatpak sélectionnée.",
         "export_done": "Réglages exportés.",
         "import_done": "Réglages importés.",
+        "export_launchers": "Exporter les presets en lanceurs",
+        "verify_launchers": "Vérifier les lanceurs exportés",
+        "launchers_done": "Lanceurs exportés : {written} écrits, {unchanged} inchangés, {removed} supprimés.\nLes scripts et fichiers .desktop suivent désormais vos presets.",
+        "launchers_ok": "Chaque lanceur exporté exécute exactement la même commande que le lanceur.",
+        "launchers_bad": "Lanceurs exportés différents du lanceur :",
         "reset_done": "Réglages réinitialisés.",
         "fav_saved": "Preset enregistré.",
         "fav_exists": "Preset existant (écrasé).",
+        "diagnostics": "Diagnostic",
+        "trace_record": "Enregistrer une trace",
+        "trace_export": "Exporter la trace",
+        "trace_exported": "Trace exportée (ouvrir le .json dans ui.perfetto.dev ou chrome://tracing).",
+        "trace_empty": "Aucune mesure enregistrée. Activez « Enregistrer une trace » puis reproduisez le problème.",
+        "tab_groups": "Groupes",
+        "grp_editor": "Groupe de lancement",
+        "grp_name": "Nom du groupe",
+        "grp_parallel": "Démarrages simultanés",
+        "grp_add_member": "Ajouter un membre",
+        "grp_member_fav": "Preset",
+        "grp_delay": "Délai avant lancement (s)",
+        "grp_after_prev": "Attendre que le membre précédent soit prêt",
+        "grp_after": "après",
+        "grp_ready": "Prêt quand",
+        "ready_start": "Démarré",
+        "ready_seconds": "Délai écoulé",
+        "ready_window": "Fenêtre affichée",
+        "grp_ready_timeout": "Délai de disponibilité (s)",
+        "grp_members": "Membres",
+        "grp_saved_list": "Groupes enregistrés",
+        "grp_save": "Enregistrer le groupe",
+        "grp_saved": "Groupe enregistré.",
+        "grp_empty": "Ajoutez au moins un membre.",
+        "grp_status": "État",
+        "grp_done": "tous les membres sont lancés",
+        "grp_state_waiting": "en attente",
+        "grp_state_starting": "lancement",
+        "grp_state_started": "lancé",
+        "grp_state_ready": "prêt",
+        "grp_state_failed": "échec",
+        "grp_state_skipped": "ignoré",
+        "detect_process": "Détecter LSFG_PROCESS après le lancement",
+        "detect_process_hint": "Suit les processus lancés et trouve celui qui charge Vulkan",
+        "detect_found": "Le processus qui a chargé Vulkan est « {name} ». L’utiliser comme LSFG_PROCESS ?",
+        "detect_save_fav": "Il sera aussi enregistré dans le preset « {fav} ».",
+        "detect_use": "Utiliser",
+        "detect_failed": "La détection a échoué sur l’hôte : {error}",
+        "monitor": "Mesurer les ressources pendant l’exécution",
+        "monitor_hint": "CPU, mémoire, threads et changements de contexte des processus lancés",
+        "monitor_interval": "Intervalle de mesure (s)",
+        "monitor_title": "Ressources",
+        "monitor_idle": "Lancez avec « Mesurer les ressources » pour voir les graphes en direct.",
+        "monitor_running": "{target} — mesure toutes les {interval:.2g} s, CPU de l’échantillonneur {agent:.2f} %",
+        "monitor_ended": "{target} — terminé après {duration:.0f} s ({samples} mesures), CPU de l’échantillonneur {agent:.2f} %",
+        "monitor_no_pid": "PID du processus hôte inconnu : mesure des ressources indisponible.",
+        "monitor_failed": "{target} — l’échantillonneur a échoué sur l’hôte après {samples} mesures : {error}",
+        "metric_cpu": "CPU",
+        "metric_rss": "Mémoire (RSS)",
+        "metric_threads": "Threads",
+        "metric_csw": "Changements de contexte",
+        "monitor_compare": "Comparer les presets",
+        "monitor_compare_title": "Sessions de {target}",
+        "monitor_compare_empty": "Aucune session mesurée pour cette cible.",
+        "recent_cmds": "Commandes récentes",
+        "recent_use": "Utiliser",
+        "tab_rules": "Règles",
+        "rule_editor": "Règle d’auto-profil",
+        "rule_editor_hint": "Sélectionner ou lancer une cible correspondante applique les options du preset",
+        "rule_field": "Critère",
+        "rule_field_flatpak": "Identifiant Flatpak",
+        "rule_field_host": "Commande hôte",
+        "rule_field_steam": "Appid Steam",
+        "rule_field_process": "LSFG_PROCESS",
+        "rule_kind": "Type de motif",
+        "rule_kind_glob": "Glob (valeur entière, * ? [ ])",
+        "rule_kind_regex": "Expression régulière (n’importe où)",
+        "rule_pattern": "Motif",
+        "rule_priority": "Priorité (la plus haute l’emporte)",
+        "rule_add": "Ajouter la règle",
+        "rule_list": "Règles",
+        "rule_no_fav": "Enregistrez d’abord un preset.",
+        "auto_profile": "Auto-profil",
+        "auto_none": "Aucune règle ne correspond",
     },
 }
 
 def tr(lang: str, key: str) -> str:
     return _STRINGS.get(lang, _STRINGS["en"]).get(key, key)
 
-# ---------------- Settings model ----------------
+# ---------------- UI ----------------
 
 @dataclass
-class Options:
-    multiplier: int = 2
-    flow_scale: int = 0
-    performance: bool = False
-    hdr: bool = False
-    present_mode: str = ""          # "" (none) or custom
-    lsfg_process: str = ""
-    extra_args: str = ""
-    mangohud: bool = False
-    extra_layers: str = ""          # additional layers tokens (':'-separated)
+class OptionRows:
+    mult: Adw.ComboRow
+    flow: Adw.SpinRow
+    perf: Adw.SwitchRow
+    hdr: Adw.SwitchRow
+    present: Adw.EntryRow
+    lsfg_proc: Adw.EntryRow
+    extra_layers: Adw.EntryRow
+    mangohud: Adw.SwitchRow
+    detect: Adw.SwitchRow
+    monitor: Adw.SwitchRow
+    monitor_interval: Adw.SpinRow
 
 @dataclass
-class Settings:
-    lang: str = "fr"
-    last_flatpak: str = ""
-    last_host_cmd: str = ""
-    favorites: list[dict] = field(default_factory=list)   # list of {"name":..., "mode":"flatpak|host", "target":"...", "options":{...}}
-    options: Options = field(default_factory=Options)
-
-def load_settings() -> Settings:
-    if CONFIG_FILE.exists():
-        try:
-            data = json.loads(CONFIG_FILE.read_text(encoding="utf-8"))
-            # nested dataclass rebuild
-            opts = Options(**data.get("options", {}))
-            s = Settings(
-                lang=data.get("lang", "fr"),
-                last_flatpak=data.get("last_flatpak", ""),
-                last_host_cmd=data.get("last_host_cmd", ""),
-                favorites=data.get("favorites", []),
-                options=opts,
-            )
-            return s
-        except Exception:
-            pass
-    return Settings()
-
-def save_settings(s: Settings) -> None:
-    CONFIG_DIR.mkdir(parents=True, exist_ok=True)
-    data = asdict(s)
-    CONFIG_FILE.write_text(json.dumps(data, indent=2, ensure_ascii=False), encoding="utf-8")
-
-# ---------------- Host helpers (flatpak-spawn) ----------------
-
-def run_host(args: list[str]) -> tuple[int, str, str]:
-    """
-    Run a command on the host through flatpak-spawn --host.
-    Returns (code, stdout, stderr).
-    """
-    proc = subprocess.run(
-        ["flatpak-spawn", "--host"] + args,
-        stdout=subprocess.PIPE,
-        stderr=subprocess.PIPE,
-        text=True,
-    )
-    return proc.returncode, proc.stdout, proc.stderr
-
-def host_has_flatpak() -> bool:
-    code, _, _ = run_host(["sh", "-lc", "command -v flatpak >/dev/null 2>&1"])
-    return code == 0
-
-def list_flatpaks() -> list[tuple[str, str]]:
-    """
-    Returns list of (appid, title). Uses host flatpak CLI.
-    """
-    if not host_has_flatpak():
-        return []
-    # columns: application,title are widely available
-    code, out, _ = run_host(["flatpak", "list", "--app", "--columns=application,title"])
-    if code != 0:
-        return []
-    rows = []
-    for line in out.splitlines():
-        if not line.strip():
-            continue
-        parts = line.split("\t")
-        appid = parts[0].strip()
-        title = parts[1].strip() if len(parts) > 1 else appid
-        rows.append((appid, title))
-    # sort by title
-    rows.sort(key=lambda x: x[1].lower())
-    return rows
+class FavoriteRows:
+    name_entry: Gtk.Entry
+    names: Gtk.StringList
+    dropdown: Gtk.DropDown
+    auto: Adw.ActionRow     # shows the auto-profile applied to the current target
 
-# ---------------- UI ----------------
+@dataclass
+class MonitorRows:
+    group: Adw.PreferencesGroup
+    rows: dict[str, Adw.ActionRow]          # metric -> row (subtitle = latest value)
+    sparks: dict[str, Gtk.DrawingArea]      # metric -> sparkline
+
+SPARK_METRICS = ["cpu", "rss", "threads", "csw"]
 
 class MainWindow(Adw.ApplicationWindow):
+    @traced("ui.window_init")
     def __init__(self, app: Adw.Application, settings: Settings):
         super().__init__(application=app)
-        self.set_title(self._t("app_title"))
-        self.set_default_size(880, 640)
-
         self.settings = settings
         self.opts = settings.options
 
+        self.set_title(self._t("app_title"))
+        self.set_default_size(880, 640)
+
         self._flatpaks: list[tuple[str, str]] = []  # (appid, title)
+        self.opt_rows: dict[str, OptionRows] = {}    # mode -> widgets
+        self.fav_rows: dict[str, FavoriteRows] = {}  # mode -> widgets
+        self._pending_fav: dict | None = None         # favorite being run (for LSFG_PROCESS detection)
+        self._auto_applied: dict[str, tuple[str, str] | None] = {}   # mode -> (target, favorite) last auto-applied
+        self._explicit_target: dict[str, str] = {}    # mode -> target whose options come from a loaded favorite
+        self._fav_order: dict[str, list[str]] = {}    # mode -> favorite names as listed (frecency order)
+        self.monitor_rows: dict[str, MonitorRows] = {}  # mode -> resource graphs
+        self._sessions: dict = {}                     # mode -> lsfgvk_sampler.Session shown in the graphs (latest launch)
+        self.fav_choice_list = Gtk.StringList.new([])  # favorite choices shared by the groups + rules editors
+        self._fav_choices: list[dict] = []
+        self._refresh_fav_choices()   # filled now: the rules page may be built before the groups page
 
         self.header = Adw.HeaderBar()
         self.set_titlebar(self.header)
@@ -250,12 +375,19 @@ class MainWindow(Adw.ApplicationWindow):
         self.stack.set_hexpand(True)
         self.stack.set_vexpand(True)
 
-        # Tabs
-        self.page_flatpak = self._build_flatpak_page()
-        self.page_host = self._build_host_page()
-
-        self.stack.add_titled(self.page_flatpak, "flatpak", self._t("tab_flatpak"))
-        self.stack.add_titled(self.page_host, "host", self._t("tab_host"))
+        # Tabs: each page starts as an empty slot (the switcher is complete at first paint) and is
+        # built one group at a time; see _ensure_page / _on_idle_build
+        self._page_slots: dict[str, Adw.Bin] = {}
+        self._page_builders: dict[str, Iterator[Adw.PreferencesPage]] = {}
+        for name, build in (("flatpak", self._build_flatpak_page), ("host", self._build_host_page),
+                            ("groups", self._build_groups_page), ("rules", self._build_rules_page)):
+            self._page_slots[name] = Adw.Bin()
+            self._page_builders[name] = build()
+            self.stack.add_titled(self._page_slots[name], name, self._t(f"tab_{name}"))
+        self.stack.connect("notify::visible-child", lambda *_: self._ensure_page(self.stack.get_visible_child_name()))
+        self._build_page_step("flatpak")      # skeleton: the visible page's target group
+        self._idle_build = GLib.idle_add(self._on_idle_build, priority=GLib.PRIORITY_LOW)
+        self.connect("destroy", self._on_destroy)
 
         # Switcher
         switcher = Adw.ViewSwitcher(stack=self.stack, policy=Adw.ViewSwitcherPolicy.WIDE)
@@ -276,8 +408,59 @@ class MainWindow(Adw.ApplicationWindow):
     def _t(self, key: str) -> str:
         return tr(self.settings.lang, key)
 
+    # ------------- Lazy page construction
+    def _build_page_step(self, name: str) -> None:
+        builder = self._page_builders.get(name)
+        if builder is None:
+            return
+        with span("ui.build_step", page=name):
+            try:
+                page = next(builder)
+            except StopIteration:
+                del self._page_builders[name]
+                return
+        slot = self._page_slots[name]
+        if slot.get_child() is None:
+            slot.set_child(page)
+
+    def _ensure_page(self, name: str | None) -> None:
+        # a tab opened before its turn is finished right away
+        with span("ui.build_page", page=name):
+            while name in self._page_builders:
+                self._build_page_step(name)
+
+    def _on_idle_build(self):
+        # one group per callback (visible page first): the main loop paints and handles input in between
+        for name in [self.stack.get_visible_child_name(), *self._page_builders]:
+            if name in self._page_builders:
+                self._build_page_step(name)
+                return True
+        self._idle_build = 0
+        return False
+
+    def _on_destroy(self, *_):
+        if self._idle_build:
+            GLib.source_remove(self._idle_build)
+            self._idle_build = 0
+        # nobody is left to show the graphs: stop the agents (their summaries are still saved)
+        for session in self._sessions.values():
+            session.stop.set()
+
     # ------------- Menu
     def _build_menu(self) -> Gtk.MenuButton:
+        btn = Gtk.MenuButton()
+        btn.set_icon_name("open-menu-symbolic")
+        # the model is only built when the menu is first opened; GTK calls the func on every
+        # popup, so it is a no-op afterwards (clearing the func from inside itself would free
+        # the running callback)
+        btn.set_create_popup_func(self._on_menu_popup)
+        return btn
+
+    def _on_menu_popup(self, btn: Gtk.MenuButton):
+        if btn.get_menu_model() is None:
+            btn.set_menu_model(self._build_menu_model())
+
+    def _build_menu_model(self) -> Gio.Menu:
         menu = Gio.Menu()
         # Language sub-menu
         lang_menu = Gio.Menu()
@@ -297,16 +480,19 @@ class MainWindow(Adw.ApplicationWindow):
         actions.append(self._t("open_config"), "app.open_config")
         actions.append(self._t("export_settings"), "app.export_settings")
         actions.append(self._t("import_settings"), "app.import_settings")
+        actions.append(self._t("export_launchers"), "app.export_launchers")
+        actions.append(self._t("verify_launchers"), "app.verify_launchers")
         actions.append(self._t("reset_settings"), "app.reset_settings")
         menu.append_section(self._t("menu"), actions)
 
-        btn = Gtk.MenuButton()
-        btn.set_icon_name("open-menu-symbolic")
-        btn.set_menu_model(menu)
-        return btn
+        diag = Gio.Menu()
+        diag.append(self._t("trace_record"), "app.trace_record")
+        diag.append(self._t("trace_export"), "app.trace_export")
+        menu.append_section(self._t("diagnostics"), diag)
+        return menu
 
     # ------------- Page: Flatpak
-    def _build_flatpak_page(self) -> Adw.PreferencesPage:
+    def _build_flatpak_page(self) -> Iterator[Adw.PreferencesPage]:
         page = Adw.PreferencesPage()
 
         # Target group
@@ -327,12 +513,17 @@ class MainWindow(Adw.ApplicationWindow):
         self.row_flatpak_args = Adw.EntryRow(title=self._t("target_extra_args"))
         self.row_flatpak_args.set_text(self.opts.extra_args or "")
         grp_target.add(self.row_flatpak_args)
+        self.dd_flatpak.connect("notify::selected", lambda *_: self._apply_auto_profile("flatpak"))
+        page.add(grp_target)
+        yield page
 
-        # Options group (shared widgets)
-        grp_opts = self._build_options_group()
+        # Options group (per-page widgets)
+        page.add(self._build_options_group(mode="flatpak"))
+        yield page
 
         # Favorites group
-        grp_fav = self._build_favorites_group(mode="flatpak")
+        page.add(self._build_favorites_group(mode="flatpak"))
+        yield page
 
         # Actions
         grp_actions = Adw.PreferencesGroup()
@@ -349,15 +540,16 @@ class MainWindow(Adw.ApplicationWindow):
         self.btn_preview_f.connect("clicked", self._on_preview_flatpak)
         self.btn_check_f.connect("clicked", self._on_check_flatpak)
         self.btn_launch_f.connect("clicked", self._on_launch_flatpak)
-
-        page.add(grp_target)
-        page.add(grp_opts)
-        page.add(grp_fav)
         page.add(grp_actions)
-        return page
+
+        # Live resource graphs of the last sampled launch (same step: launching refreshes them)
+        page.add(self._build_monitor_group(mode="flatpak"))
+        # the app list may have loaded before the options existed
+        self._apply_auto_profile("flatpak")
+        yield page
 
     # ------------- Page: Host
-    def _build_host_page(self) -> Adw.PreferencesPage:
+    def _build_host_page(self) -> Iterator[Adw.PreferencesPage]:
         page = Adw.PreferencesPage()
 
         grp_target = Adw.PreferencesGroup(title=self._t("target_host_cmd"))
@@ -372,9 +564,26 @@ class MainWindow(Adw.ApplicationWindow):
         self.row_host_args.set_text(self.opts.extra_args or "")
         grp_target.add(self.row_host_args)
 
-        grp_opts = self._build_options_group()
+        # Recent commands (launch history, frecency order)
+        self.host_recent_list = Gtk.StringList.new([])
+        self.dd_host_recent = Gtk.DropDown(model=self.host_recent_list, enable_search=True)
+        self.dd_host_recent.set_hexpand(True)
+        btn_recent = Gtk.Button(label=self._t("recent_use"))
+        btn_recent.connect("clicked", self._on_host_recent_use)
+        row_recent = Adw.ActionRow(title=self._t("recent_cmds"))
+        row_recent.add_suffix(self.dd_host_recent)
+        row_recent.add_suffix(btn_recent)
+        grp_target.add(row_recent)
+        self.row_host_cmd.connect("entry-activated", lambda *_: self._apply_auto_profile("host"))
+        page.add(grp_target)
+        yield page
+
+        self._refresh_host_recent()
+        page.add(self._build_options_group(mode="host"))
+        yield page
 
-        grp_fav = self._build_favorites_group(mode="host")
+        page.add(self._build_favorites_group(mode="host"))
+        yield page
 
         grp_actions = Adw.PreferencesGroup()
         box_btn = Gtk.Box(spacing=8)
@@ -389,68 +598,200 @@ class MainWindow(Adw.ApplicationWindow):
         self.btn_preview_h.connect("clicked", self._on_preview_host)
         self.btn_check_h.connect("clicked", self._on_check_host)
         self.btn_launch_h.connect("clicked", self._on_launch_host)
-
-        page.add(grp_target)
-        page.add(grp_opts)
-        page.add(grp_fav)
         page.add(grp_actions)
-        return page
+
+        # Live resource graphs of the last sampled launch (same step: launching refreshes them)
+        page.add(self._build_monitor_group(mode="host"))
+        yield page
+
+    # ------------- Page: Launch groups
+    def _build_groups_page(self) -> Iterator[Adw.PreferencesPage]:
+        page = Adw.PreferencesPage()
+        self._group_members: list[GroupMember] = []   # group being edited
+        self._group_member_rows: list[Adw.ActionRow] = []
+        self._group_runs: dict[str, GroupRun] = {}
+
+        # Editor: name + concurrency
+        grp_edit = Adw.PreferencesGroup(title=self._t("grp_editor"))
+        self.row_group_name = Adw.EntryRow(title=self._t("grp_name"))
+        grp_edit.add(self.row_group_name)
+        adj = Gtk.Adjustment(lower=1, upper=8, step_increment=1, page_increment=1, page_size=0)
+        self.row_group_parallel = Adw.SpinRow(title=self._t("grp_parallel"), adjustment=adj)
+        self.row_group_parallel.set_value(1)
+        grp_edit.add(self.row_group_parallel)
+        page.add(grp_edit)
+        yield page
+
+        # New member
+        grp_add = Adw.PreferencesGroup(title=self._t("grp_add_member"))
+        self.row_member_fav = Adw.ComboRow(title=self._t("grp_member_fav"))
+        self.row_member_fav.set_model(self.fav_choice_list)
+        grp_add.add(self.row_member_fav)
+
+        adj = Gtk.Adjustment(lower=0, upper=600, step_increment=1, page_increment=10, page_size=0)
+        self.row_member_delay = Adw.SpinRow(title=self._t("grp_delay"), adjustment=adj)
+        grp_add.add(self.row_member_delay)
+
+        self.row_member_after = Adw.SwitchRow(title=self._t("grp_after_prev"))
+        grp_add.add(self.row_member_after)
+
+        self.row_member_ready = Adw.ComboRow(title=self._t("grp_ready"))
+        self.row_member_ready.set_model(Gtk.StringList.new([self._t(f"ready_{m}") for m in READY_MODES]))
+        self.row_member_ready.set_selected(READY_MODES.index("seconds"))
+        grp_add.add(self.row_member_ready)
+
+        adj = Gtk.Adjustment(lower=0, upper=600, step_increment=1, page_increment=10, page_size=0)
+        self.row_member_timeout = Adw.SpinRow(title=self._t("grp_ready_timeout"), adjustment=adj)
+        self.row_member_timeout.set_value(5)
+        grp_add.add(self.row_member_timeout)
+
+        btn_add = Gtk.Button(label=self._t("grp_add_member"))
+        btn_add.connect("clicked", self._on_group_add_member)
+        grp_add.add(btn_add)
+        page.add(grp_add)
+
+        # Members of the edited group (rows rebuilt on change)
+        self.grp_members = Adw.PreferencesGroup(title=self._t("grp_members"))
+        page.add(self.grp_members)
+        yield page
+
+        # Saved groups
+        grp_saved = Adw.PreferencesGroup(title=self._t("grp_saved_list"))
+        self.group_names = Gtk.StringList.new([g.get("name", "") for g in self.settings.groups])
+        self.dd_group = Gtk.DropDown(model=self.group_names, enable_search=True)
+        self.dd_group.set_hexpand(True)
+        box_btn = Gtk.Box(spacing=6)
+        btn_save = Gtk.Button(label=self._t("grp_save"))
+        btn_load = Gtk.Button(label=self._t("fav_load"))
+        btn_run = Gtk.Button(label=self._t("fav_run"))
+        btn_del = Gtk.Button(label=self._t("fav_delete"))
+        for b in (btn_save, btn_load, btn_run, btn_del):
+            box_btn.append(b)
+        row = Adw.ActionRow()
+        row.add_suffix(self.dd_group)
+        row.add_suffix(box_btn)
+        grp_saved.add(row)
+        self.row_group_status = Adw.ActionRow(title=self._t("grp_status"))
+        grp_saved.add(self.row_group_status)
+
+        btn_save.connect("clicked", self._on_group_save)
+        btn_load.connect("clicked", self._on_group_load)
+        btn_run.connect("clicked", self._on_group_run)
+        btn_del.connect("clicked", self._on_group_delete)
+        page.add(grp_saved)
+        yield page
+
+    # ------------- Page: Auto-profile rules
+    def _build_rules_page(self) -> Iterator[Adw.PreferencesPage]:
+        page = Adw.PreferencesPage()
+        self._rule_rows: list[Adw.ActionRow] = []
+
+        grp_edit = Adw.PreferencesGroup(title=self._t("rule_editor"), description=self._t("rule_editor_hint"))
+        self.row_rule_field = Adw.ComboRow(title=self._t("rule_field"))
+        self.row_rule_field.set_model(Gtk.StringList.new([self._t(f"rule_field_{f}") for f in FIELDS]))
+        grp_edit.add(self.row_rule_field)
+
+        self.row_rule_kind = Adw.ComboRow(title=self._t("rule_kind"))
+        self.row_rule_kind.set_model(Gtk.StringList.new([self._t(f"rule_kind_{k}") for k in KINDS]))
+        grp_edit.add(self.row_rule_kind)
+
+        self.row_rule_pattern = Adw.EntryRow(title=self._t("rule_pattern"))
+        grp_edit.add(self.row_rule_pattern)
+
+        # same favorite choices as the launch groups editor
+        self.row_rule_fav = Adw.ComboRow(title=self._t("grp_member_fav"))
+        self.row_rule_fav.set_model(self.fav_choice_list)
+        grp_edit.add(self.row_rule_fav)
+
+        adj = Gtk.Adjustment(lower=-100, upper=100, step_increment=1, page_increment=10, page_size=0)
+        self.row_rule_priority = Adw.SpinRow(title=self._t("rule_priority"), adjustment=adj)
+        grp_edit.add(self.row_rule_priority)
+
+        btn_add = Gtk.Button(label=self._t("rule_add"))
+        btn_add.connect("clicked", self._on_rule_add)
+        grp_edit.add(btn_add)
+        page.add(grp_edit)
+        yield page
+
+        # Saved rules (rows rebuilt on change)
+        self.grp_rules = Adw.PreferencesGroup(title=self._t("rule_list"))
+        self._rebuild_rule_rows()
+        page.add(self.grp_rules)
+        yield page
 
     # ------------- Shared Options group
-    def _build_options_group(self) -> Adw.PreferencesGroup:
+    def _build_options_group(self, mode: str) -> Adw.PreferencesGroup:
         grp = Adw.PreferencesGroup(title=self._t("options"))
 
         # Multiplier
-        self.row_mult = Adw.ComboRow(title=self._t("multiplier"))
-        mults = ["2", "3", "4", "6", "8"]
-        self._mult_list = Gtk.StringList.new(mults)
-        self.row_mult.set_model(self._mult_list)
+        row_mult = Adw.ComboRow(title=self._t("multiplier"))
+        row_mult.set_model(Gtk.StringList.new(MULTIPLIERS))
         try:
-            idx = mults.index(str(self.opts.multiplier))
+            idx = MULTIPLIERS.index(str(self.opts.multiplier))
         except ValueError:
             idx = 0
-        self.row_mult.set_selected(idx)
-        grp.add(self.row_mult)
+        row_mult.set_selected(idx)
+        grp.add(row_mult)
 
         # Flow scale (0..3)
         adj = Gtk.Adjustment(lower=0, upper=8, step_increment=1, page_increment=1, page_size=0)
-        self.row_flow = Adw.SpinRow(title=self._t("flow_scale"), adjustment=adj)
-        self.row_flow.set_value(float(self.opts.flow_scale))
-        grp.add(self.row_flow)
+        row_flow = Adw.SpinRow(title=self._t("flow_scale"), adjustment=adj)
+        row_flow.set_value(float(self.opts.flow_scale))
+        grp.add(row_flow)
 
         # Performance
-        self.row_perf = Adw.SwitchRow(title=self._t("performance"))
-        self.row_perf.set_active(self.opts.performance)
-        grp.add(self.row_perf)
+        row_perf = Adw.SwitchRow(title=self._t("performance"))
+        row_perf.set_active(self.opts.performance)
+        grp.add(row_perf)
 
         # HDR
-        self.row_hdr = Adw.SwitchRow(title=self._t("hdr"))
-        self.row_hdr.set_active(self.opts.hdr)
-        grp.add(self.row_hdr)
+        row_hdr = Adw.SwitchRow(title=self._t("hdr"))
+        row_hdr.set_active(self.opts.hdr)
+        grp.add(row_hdr)
 
         # Present mode (free text for now; empty=none)
-        self.row_present = Adw.EntryRow(title=self._t("present_mode"))
-        self.row_present.set_text(self.opts.present_mode or "")
-        grp.add(self.row_present)
+        row_present = Adw.EntryRow(title=self._t("present_mode"))
+        row_present.set_text(self.opts.present_mode or "")
+        grp.add(row_present)
 
         # LSFG_PROCESS
-        self.row_lsfg_proc = Adw.EntryRow(title=self._t("lsfg_process"))
-        self.row_lsfg_proc.set_text(self.opts.lsfg_process or "")
-        grp.add(self.row_lsfg_proc)
+        row_lsfg_proc = Adw.EntryRow(title=self._t("lsfg_process"))
+        row_lsfg_proc.set_text(self.opts.lsfg_process or "")
+        grp.add(row_lsfg_proc)
 
         # Extra layers (append to VK_INSTANCE_LAYERS)
-        self.row_extra_layers = Adw.EntryRow(title="Extra Vulkan layers (':' separated)")
-        self.row_extra_layers.set_text(self.opts.extra_layers or "")
-        grp.add(self.row_extra_layers)
+        row_extra_layers = Adw.EntryRow(title="Extra Vulkan layers (':' separated)")
+        row_extra_layers.set_text(self.opts.extra_layers or "")
+        grp.add(row_extra_layers)
 
         # MangoHud
-        self.row_mangohud = Adw.SwitchRow(title=self._t("mangohud"))
-        self.row_mangohud.set_active(self.opts.mangohud)
-        grp.add(self.row_mangohud)
+        row_mangohud = Adw.SwitchRow(title=self._t("mangohud"))
+        row_mangohud.set_active(self.opts.mangohud)
+        grp.add(row_mangohud)
+
+        # LSFG_PROCESS auto-detection (host process-tree watcher)
+        row_detect = Adw.SwitchRow(title=self._t("detect_process"), subtitle=self._t("detect_process_hint"))
+        row_detect.set_active(self.opts.detect_process)
+        grp.add(row_detect)
+
+        # Resource sampling (host agent) + its interval
+        row_monitor = Adw.SwitchRow(title=self._t("monitor"), subtitle=self._t("monitor_hint"))
+        row_monitor.set_active(self.opts.monitor)
+        grp.add(row_monitor)
+        adj = Gtk.Adjustment(lower=0.25, upper=10, step_increment=0.25, page_increment=1, page_size=0)
+        row_monitor_interval = Adw.SpinRow(title=self._t("monitor_interval"), adjustment=adj, digits=2)
+        row_monitor_interval.set_value(float(self.opts.monitor_interval))
+        grp.add(row_monitor_interval)
 
         # Extra args (shared default) — NOTE: per-page also exists; we keep this as "default"
         # (Kept minimal to avoid duplicate UI; pages have their own "args" entry.)
 
+        # Each page keeps its own widgets (the Flatpak page must not read the Host page rows)
+        self.opt_rows[mode] = OptionRows(
+            mult=row_mult, flow=row_flow, perf=row_perf, hdr=row_hdr, present=row_present,
+            lsfg_proc=row_lsfg_proc, extra_layers=row_extra_layers, mangohud=row_mangohud, detect=row_detect,
+            monitor=row_monitor, monitor_interval=row_monitor_interval,
+        )
         return grp
 
     # ------------- Favorites group
@@ -458,40 +799,48 @@ class MainWindow(Adw.ApplicationWindow):
         grp = Adw.PreferencesGroup(title=self._t("favorites"))
 
         row = Adw.ActionRow(title=self._t("fav_name"))
-        self.fav_name_entry = Gtk.Entry()
-        self.fav_name_entry.set_hexpand(True)
-        row.add_suffix(self.fav_name_entry)
+        fav_name_entry = Gtk.Entry()
+        fav_name_entry.set_hexpand(True)
+        row.add_suffix(fav_name_entry)
         grp.add(row)
 
         box_btn = Gtk.Box(spacing=6)
-        self.btn_fav_save = Gtk.Button(label=self._t("fav_save"))
-        self.btn_fav_load = Gtk.Button(label=self._t("fav_load"))
-        self.btn_fav_run = Gtk.Button(label=self._t("fav_run"))
-        self.btn_fav_del = Gtk.Button(label=self._t("fav_delete"))
-        for b in (self.btn_fav_save, self.btn_fav_load, self.btn_fav_run, self.btn_fav_del):
+        btn_fav_save = Gtk.Button(label=self._t("fav_save"))
+        btn_fav_load = Gtk.Button(label=self._t("fav_load"))
+        btn_fav_run = Gtk.Button(label=self._t("fav_run"))
+        btn_fav_del = Gtk.Button(label=self._t("fav_delete"))
+        for b in (btn_fav_save, btn_fav_load, btn_fav_run, btn_fav_del):
             box_btn.append(b)
 
         # Fav list dropdown
-        self.fav_list = Gtk.StringList.new([f["name"] for f in self.settings.favorites if f.get("mode") == mode])
-        self.dd_fav = Gtk.DropDown(model=self.fav_list, enable_search=True)
-        self.dd_fav.set_hexpand(True)
+        fav_list = Gtk.StringList.new(self._rank_favs(mode))
+        dd_fav = Gtk.DropDown(model=fav_list, enable_search=True)
+        dd_fav.set_hexpand(True)
 
         row2 = Adw.ActionRow()
-        row2.add_suffix(self.dd_fav)
+        row2.add_suffix(dd_fav)
         row2.add_suffix(box_btn)
         grp.add(row2)
 
+        row_auto = Adw.ActionRow(title=self._t("auto_profile"), subtitle=self._t("auto_none"))
+        grp.add(row_auto)
+
+        self.fav_rows[mode] = FavoriteRows(name_entry=fav_name_entry, names=fav_list, dropdown=dd_fav, auto=row_auto)
+
         # callbacks (use lambda capture of mode)
-        self.btn_fav_save.connect("clicked", lambda *_: self._on_fav_save(mode))
-        self.btn_fav_load.connect("clicked", lambda *_: self._on_fav_load(mode))
-        self.btn_fav_run.connect("clicked", lambda *_: self._on_fav_run(mode))
-        self.btn_fav_del.connect("clicked", lambda *_: self._on_fav_delete(mode))
+        btn_fav_save.connect("clicked", lambda *_: self._on_fav_save(mode))
+        btn_fav_load.connect("clicked", lambda *_: self._on_fav_load(mode))
+        btn_fav_run.connect("clicked", lambda *_: self._on_fav_run(mode))
+        btn_fav_del.connect("clicked", lambda *_: self._on_fav_delete(mode))
         return grp
 
     # ------------- Flatpak list loading
     def _refresh_flatpak_list_async(self):
         def work(_task, _src, _data, _cancellable):
-            return list_flatpaks()
+            rows = list_flatpaks()
+            scores = history().frecency("flatpak")
+            rows.sort(key=lambda r: -scores.get(r[0], 0.0))   # most used first, then by title
+            return rows
 
         def done(_obj, res, _data):
             try:
@@ -514,49 +863,27 @@ class MainWindow(Adw.ApplicationWindow):
 
         GLib.Task.new(None, None, done).run_in_thread(work, None)
 
-    # ------------- Env builder
-    def _build_env(self) -> dict[str, str]:
-        env: dict[str, str] = {}
-        # read current UI
-        mult = int(["2","3","4","6","8"][self.row_mult.get_selected()])
-        flow = int(self.row_flow.get_value())
-        perf = self.row_perf.get_active()
-        hdr  = self.row_hdr.get_active()
-        present = self.row_present.get_text().strip()
-        lsfg_proc = self.row_lsfg_proc.get_text().strip()
-        extra_layers = self.row_extra_layers.get_text().strip()
-        mangohud = self.row_mangohud.get_active()
-
-        env["LSFG_MULTIPLIER"] = str(mult)
-        env["LSFG_FLOW_SCALE"] = str(flow)
-        env["LSFG_PERFORMANCE_MODE"] = "1" if perf else "0"
-        env["LSFG_HDR_MODE"] = "1" if hdr else "0"
-        if present:
-            env["LSFG_PRESENT_MODE"] = present
-        if lsfg_proc:
-            env["LSFG_PROCESS"] = lsfg_proc
-
-        layers = ["lsfg_vk"]
-        if mangohud:
-            layers.append("VK_LAYER_MANGOHUD_overlay")
-            env["MANGOHUD"] = "1"
-        if extra_layers:
-            layers.extend([tok for tok in extra_layers.split(":") if tok])
-
-        env["VK_INSTANCE_LAYERS"] = ":".join(layers)
-        return env
-
-    # ------------- Helpers for command construction
-    @staticmethod
-    def _env_to_flatpak_args(env: dict[str, str]) -> list[str]:
-        args: list[str] = []
-        for k, v in env.items():
-            args += ["--env", f"{k}={v}"]
-        return args
+    # ------------- Options <-> UI
+    def _collect_options(self, mode: str) -> Options:
+        rows = self.opt_rows[mode]
+        args_row = self.row_flatpak_args if mode == "flatpak" else self.row_host_args
+        return Options(
+            multiplier=int(MULTIPLIERS[rows.mult.get_selected()]),
+            flow_scale=int(rows.flow.get_value()),
+            performance=rows.perf.get_active(),
+            hdr=rows.hdr.get_active(),
+            present_mode=rows.present.get_text().strip(),
+            lsfg_process=rows.lsfg_proc.get_text().strip(),
+            extra_args=args_row.get_text().strip(),
+            mangohud=rows.mangohud.get_active(),
+            extra_layers=rows.extra_layers.get_text().strip(),
+            detect_process=rows.detect.get_active(),
+            monitor=rows.monitor.get_active(),
+            monitor_interval=float(rows.monitor_interval.get_value()),
+        )
 
-    @staticmethod
-    def _env_prefix_shell(env: dict[str, str]) -> str:
-        return " ".join(f"{k}={shlex.quote(v)}" for k, v in env.items())
+    def _build_env(self, mode: str) -> dict[str, str]:
+        return build_env(self._collect_options(mode))
 
     # ------------- Dialog helpers
     def _message(self, title: str, body: str):
@@ -566,32 +893,33 @@ class MainWindow(Adw.ApplicationWindow):
         dlg.present()
 
     # ------------- Flatpak actions
+    def _selected_flatpak(self) -> str | None:
+        idx = int(self.dd_flatpak.get_selected())
+        if idx < 0 or idx >= len(self._flatpak_ids):
+            return None
+        return self._flatpak_ids[idx]
+
     def _on_preview_flatpak(self, _btn):
         if not host_has_flatpak():
             self._message(self._t("error"), self._t("no_flatpak_cli"))
             return
-        idx = int(self.dd_flatpak.get_selected())
-        if idx < 0 or idx >= len(self._flatpak_ids):
+        appid = self._selected_flatpak()
+        if appid is None:
             self._message(self._t("error"), self._t("no_selection"))
             return
-        appid = self._flatpak_ids[idx]
-        env = self._build_env()
-        extra = shlex.split(self.row_flatpak_args.get_text().strip()) if self.row_flatpak_args.get_text() else []
-        cmd = ["flatpak-spawn","--host","flatpak","run"] + self._env_to_flatpak_args(env) + [appid] + extra
+        opts = self._collect_options("flatpak")
+        cmd = flatpak_launch_cmd(appid, build_env(opts), split_args(opts.extra_args))
         self._message("Preview", " ".join(shlex.quote(x) for x in cmd))
 
     def _on_check_flatpak(self, _btn):
         if not host_has_flatpak():
             self._message(self._t("error"), self._t("no_flatpak_cli"))
             return
-        idx = int(self.dd_flatpak.get_selected())
-        if idx < 0 or idx >= len(self._flatpak_ids):
+        appid = self._selected_flatpak()
+        if appid is None:
             self._message(self._t("error"), self._t("no_selection"))
             return
-        appid = self._flatpak_ids[idx]
-        env = self._build_env()
-        extra = ""  # we just check
-        env_args = self._env_to_flatpak_args(env)
+        env = self._build_env("flatpak")
         # Run a shell inside the app sandbox to inspect env and layers
         shell = (
             "set -e; "
@@ -603,27 +931,29 @@ class MainWindow(Adw.ApplicationWindow):
             "done; "
             "echo; echo 'OK'; "
         )
-        cmd = ["flatpak-spawn","--host","flatpak","run"] + env_args + ["--command=sh", appid, "-lc", shell]
+        cmd = ["flatpak-spawn","--host","flatpak","run"] + env_to_flatpak_args(env) + ["--command=sh", appid, "-lc", shell]
         code, out, err = run_host(cmd[2:])  # skip first two since run_host re-adds --host
         self._message(self._t("injection_result"), (out or "") + ("\n" + err if err else ""))
 
+    @traced("launch.flatpak")
     def _on_launch_flatpak(self, _btn):
         if not host_has_flatpak():
             self._message(self._t("error"), self._t("no_flatpak_cli"))
             return
-        idx = int(self.dd_flatpak.get_selected())
-        if idx < 0 or idx >= len(self._flatpak_ids):
+        appid = self._selected_flatpak()
+        if appid is None:
             self._message(self._t("error"), self._t("no_selection"))
             return
-        appid = self._flatpak_ids[idx]
         self.settings.last_flatpak = appid
         save_settings(self.settings)
+        if self._pending_fav is None:
+            self._apply_auto_profile("flatpak")
 
-        env = self._build_env()
-        extra = shlex.split(self.row_flatpak_args.get_text().strip()) if self.row_flatpak_args.get_text() else []
-        cmd = ["flatpak-spawn","--host","flatpak","run"] + self._env_to_flatpak_args(env) + [appid] + extra
+        opts = self._collect_options("flatpak")
+        cmd = flatpak_launch_cmd(appid, build_env(opts), split_args(opts.extra_args))
         # detach
-        subprocess.Popen(cmd)
+        popen = self._spawn("flatpak", appid, cmd, opts)
+        record_launch("flatpak", appid, self._launch_preset("flatpak"), opts, popen)
 
     # ------------- Host actions
     def _on_preview_host(self, _btn):
@@ -631,11 +961,8 @@ class MainWindow(Adw.ApplicationWindow):
         if not target:
             self._message(self._t("error"), self._t("host_cmd_placeholder"))
             return
-        env = self._build_env()
-        extra = shlex.split(self.row_host_args.get_text().strip()) if self.row_host_args.get_text() else []
-        env_prefix = self._env_prefix_shell(env)
-        shell = f"{env_prefix} {shlex.quote(target)} {' '.join(shlex.quote(x) for x in extra)}"
-        cmd = ["flatpak-spawn","--host","sh","-lc", shell]
+        opts = self._collect_options("host")
+        cmd = host_launch_cmd(target, build_env(opts), split_args(opts.extra_args))
         self._message("Preview", " ".join(shlex.quote(x) for x in cmd))
 
     def _on_check_host(self, _btn):
@@ -643,8 +970,7 @@ class MainWindow(Adw.ApplicationWindow):
         if not target:
             self._message(self._t("error"), self._t("host_cmd_placeholder"))
             return
-        env = self._build_env()
-        env_prefix = self._env_prefix_shell(env)
+        env_prefix = env_prefix_shell(self._build_env("host"))
         shell = (
             f"{env_prefix} env | grep -E '^(LSFG_|MANGOHUD=|VK_INSTANCE_LAYERS=)'; "
             "echo; echo '=== Layer JSON on host ==='; "
@@ -655,6 +981,19 @@ class MainWindow(Adw.ApplicationWindow):
         code, out, err = run_host(["sh","-lc", shell])
         self._message(self._t("injection_result"), (out or "") + ("\n" + err if err else ""))
 
+    def _refresh_host_recent(self):
+        recent = history().top_targets("host")
+        self.host_recent_list.splice(0, self.host_recent_list.get_n_items(), recent)
+        return False   # also used as a one-shot GLib timeout
+
+    def _on_host_recent_use(self, _btn):
+        item = self.dd_host_recent.get_selected_item()
+        if item is None:
+            return
+        self.row_host_cmd.set_text(item.get_string())
+        self._apply_auto_profile("host")
+
+    @traced("launch.host")
     def _on_launch_host(self, _btn):
         target = self.row_host_cmd.get_text().strip()
         if not target:
@@ -662,72 +1001,243 @@ class MainWindow(Adw.ApplicationWindow):
             return
         self.settings.last_host_cmd = target
         save_settings(self.settings)
+        if self._pending_fav is None:
+            self._apply_auto_profile("host")
+
+        opts = self._collect_options("host")
+        cmd = host_launch_cmd(target, build_env(opts), split_args(opts.extra_args))
+        popen = self._spawn("host", target, cmd, opts)
+        record_launch("host", target, self._launch_preset("host"), opts, popen)
+        # the history writer commits in batches: re-rank once this launch is in
+        GLib.timeout_add(500, self._refresh_host_recent)
+
+    def _launch_preset(self, mode: str) -> str:
+        # favorite being run, else the auto-profile applied to this target (launch records)
+        if self._pending_fav is not None:
+            return self._pending_fav.get("name", "")
+        applied = self._auto_applied.get(mode)
+        return applied[1] if applied else ""
+
+    # ------------- Spawning (+ optional LSFG_PROCESS detection / resource sampling)
+    def _spawn(self, mode: str, target: str, cmd: list[str], opts: Options) -> subprocess.Popen:
+        detect = opts.detect_process and not opts.lsfg_process
+        if not detect and not opts.monitor:
+            with span("launch.popen", target=cmd[-1]):
+                return subprocess.Popen(cmd)
+        # the host pid arrives on a worker thread: the main loop never waits for flatpak-spawn
+        fav, preset = self._pending_fav, self._launch_preset(mode)
+        proc = spawn_host(cmd, on_pid=lambda pid: GLib.idle_add(
+            self._on_host_pid, mode, target, opts, fav, preset, detect, pid))
+        return proc.popen
+
+    def _on_host_pid(self, mode: str, target: str, opts: Options, fav: dict | None, preset: str,
+                     detect: bool, host_pid: int | None):
+        # main thread (GLib.idle_add), once spawn_host learned the launched command's host pid
+        if not host_pid:
+            if opts.monitor:
+                self._message(self._t("error"), self._t("monitor_no_pid"))
+            return False
+        # imported on first use: only supervised launches need the agent + sampler
+        from lsfgvk_hostagent import watch_for_vulkan
+        from lsfgvk_sampler import Session, start_session
+        if detect:
+            self._set_detect_subtitle(mode, self._t("detect_process_hint"))
+            watch_for_vulkan(host_pid, lambda name, _pid: GLib.idle_add(self._offer_lsfg_process, mode, fav, name),
+                             on_done=lambda stats: "error" in stats and GLib.idle_add(
+                                 self._on_detect_failed, mode, stats["error"]))
+        if opts.monitor:
+            session = Session(mode, target, preset, asdict(opts), opts.monitor_interval)
+            previous = self._sessions.get(mode)
+            if previous is not None:
+                previous.stop.set()   # one sampled launch per mode: the graphs follow the new one
+            self._sessions[mode] = session
+            self._refresh_monitor(mode)
+            start_session(session, host_pid,
+                          on_sample=lambda s: GLib.idle_add(self._on_session_update, mode, s),
+                          on_done=lambda s: GLib.idle_add(self._on_session_update, mode, s))
+        return False
+
+    # ------------- Resource graphs
+    def _build_monitor_group(self, mode: str) -> Adw.PreferencesGroup:
+        grp = Adw.PreferencesGroup(title=self._t("monitor_title"), description=self._t("monitor_idle"))
+        btn_compare = Gtk.Button(label=self._t("monitor_compare"))
+        btn_compare.connect("clicked", lambda *_: self._on_monitor_compare(mode))
+        grp.set_header_suffix(btn_compare)
+        rows, sparks = {}, {}
+        for metric in SPARK_METRICS:
+            row = Adw.ActionRow(title=self._t(f"metric_{metric}"), subtitle="—")
+            area = Gtk.DrawingArea(content_width=180, content_height=28)
+            area.set_valign(Gtk.Align.CENTER)
+            area.set_draw_func(self._draw_sparkline, (mode, metric))
+            row.add_suffix(area)
+            grp.add(row)
+            rows[metric], sparks[metric] = row, area
+        self.monitor_rows[mode] = MonitorRows(group=grp, rows=rows, sparks=sparks)
+        return grp
+
+    def _draw_sparkline(self, _area, cr, width: int, height: int, key):
+        session = self._sessions.get(key[0])
+        if session is None:
+            return
+        from lsfgvk_sampler import sparkline_points   # loaded with the session already
+        points = sparkline_points(session.rings[key[1]], width, height)
+        if not points:
+            return
+        cr.set_source_rgba(0.21, 0.52, 0.89, 1.0)   # Adwaita blue
+        cr.set_line_width(1.5)
+        cr.move_to(*points[0])
+        for x, y in points[1:]:
+            cr.line_to(x, y)
+        cr.stroke()
+
+    @staticmethod
+    def _format_metric(metric: str, value: float) -> str:
+        if metric == "cpu":
+            return f"{value:.0f} %"
+        if metric == "rss":
+            return f"{value / (1 << 20):.0f} MiB"
+        if metric == "csw":
+            return f"{value:.0f} /s"
+        return f"{value:.0f}"
+
+    def _refresh_monitor(self, mode: str):
+        mon, session = self.monitor_rows.get(mode), self._sessions.get(mode)
+        if mon is None or session is None:
+            return
+        if session.error:
+            desc = self._t("monitor_failed").format(target=session.target, samples=session.samples, error=session.error)
+        elif session.running:
+            desc = self._t("monitor_running").format(
+                target=session.target, interval=session.agent_interval, agent=session.agent_cpu)
+        else:
+            summary = session.summary()
+            desc = self._t("monitor_ended").format(
+                target=session.target, duration=summary["duration"], samples=session.samples, agent=session.agent_cpu)
+        mon.group.set_description(desc)
+        for metric, row in mon.rows.items():
+            ring = session.rings[metric]
+            if len(ring):
+                peak = max(ring.values())
+                row.set_subtitle(f"{self._format_metric(metric, ring.last())}  (max {self._format_metric(metric, peak)})")
+            mon.sparks[metric].queue_draw()
+
+    def _on_session_update(self, mode: str, session):
+        # main thread (GLib.idle_add); a replaced session may still report once while stopping
+        if self._sessions.get(mode) is session:
+            self._refresh_monitor(mode)
+        return False
+
+    def _on_monitor_compare(self, mode: str):
+        session = self._sessions.get(mode)
+        if session is not None:
+            target = session.target
+        elif mode == "flatpak":
+            target = self._selected_flatpak() or ""
+        else:
+            target = self.row_host_cmd.get_text().strip()
+        rows = history().compare_presets(mode, target)
+        if not rows:
+            self._message(self._t("monitor_title"), self._t("monitor_compare_empty"))
+            return
+        lines = []
+        for r in rows:
+            lines.append(
+                f"{r['preset'] or '—'} [{r['options_hash'][:6]}] × {r['sessions']}: "
+                f"CPU {r['cpu_avg']:.0f} % (max {r['cpu_max']:.0f} %), RSS {r['rss_max'] / (1 << 20):.0f} MiB, "
+                f"{r['threads_avg']:.0f} threads, {r['csw_avg']:.0f} csw/s"
+            )
+        self._message(self._t("monitor_compare_title").format(target=target), "\n".join(lines))
+
+    def _offer_lsfg_process(self, mode: str, fav: dict | None, name: str):
+        # main thread (GLib.idle_add)
+        if not name:
+            return False
+        body = self._t("detect_found").format(name=name)
+        if fav:
+            body += "\n" + self._t("detect_save_fav").format(fav=fav.get("name", ""))
+        dlg = Adw.MessageDialog.new(self, self._t("lsfg_process"), body)
+        dlg.add_response("cancel", self._t("cancel"))
+        dlg.add_response("save", self._t("detect_use"))
+        dlg.set_response_appearance("save", Adw.ResponseAppearance.SUGGESTED)
+        dlg.set_default_response("save")
+        dlg.set_close_response("cancel")
+        dlg.connect("response", lambda _d, resp: resp == "save" and self._use_lsfg_process(mode, fav, name))
+        dlg.present()
+        return False
 
-        env = self._build_env()
-        extra = shlex.split(self.row_host_args.get_text().strip()) if self.row_host_args.get_text() else []
-        env_prefix = self._env_prefix_shell(env)
-        shell = f"{env_prefix} exec {shlex.quote(target)} {' '.join(shlex.quote(x) for x in extra)}"
-        subprocess.Popen(["flatpak-spawn","--host","sh","-lc", shell])
+    def _on_detect_failed(self, mode: str, error: str):
+        # main thread (GLib.idle_add); shown until the next detecting launch
+        self._set_detect_subtitle(mode, self._t("detect_failed").format(error=error))
+        return False
+
+    def _set_detect_subtitle(self, mode: str, text: str):
+        rows = self.opt_rows.get(mode)   # None while the page is not built yet
+        if rows is not None:
+            rows.detect.set_subtitle(text)
+
+    def _use_lsfg_process(self, mode: str, fav: dict | None, name: str):
+        self.opt_rows[mode].lsfg_proc.set_text(name)
+        if fav is not None and fav in self.settings.favorites:
+            fav.setdefault("options", {})["lsfg_process"] = name
+            put_favorite(self.settings, fav)
+            self._sync_exports()
 
     # ------------- Favorites (save/load/run/delete)
-    def _collect_options_snapshot(self) -> dict:
-        return {
-            "multiplier": int(["2","3","4","6","8"][self.row_mult.get_selected()]),
-            "flow_scale": int(self.row_flow.get_value()),
-            "performance": self.row_perf.get_active(),
-            "hdr": self.row_hdr.get_active(),
-            "present_mode": self.row_present.get_text().strip(),
-            "lsfg_process": self.row_lsfg_proc.get_text().strip(),
-            "extra_layers": self.row_extra_layers.get_text().strip(),
-            "mangohud": self.row_mangohud.get_active(),
-            "extra_args": "",  # page-specific args handled separately
-        }
-
-    def _apply_options_snapshot(self, snap: dict):
-        mults = ["2","3","4","6","8"]
+    def _fav_names(self, mode: str) -> list[str]:
+        # order shown in the dropdown; index lookups must use this same snapshot
+        return self._fav_order.get(mode, [])
+
+    def _rank_favs(self, mode: str) -> list[str]:
+        names = [f["name"] for f in self.settings.favorites if f.get("mode") == mode]
+        self._fav_order[mode] = history().rank(mode, names, by="preset")   # most used first
+        return self._fav_order[mode]
+
+    def _collect_options_snapshot(self, mode: str) -> dict:
+        return asdict(self._collect_options(mode))
+
+    def _apply_options_snapshot(self, mode: str, snap: dict):
+        rows = self.opt_rows[mode]
         try:
-            self.row_mult.set_selected(mults.index(str(snap.get("multiplier", 2))))
+            rows.mult.set_selected(MULTIPLIERS.index(str(snap.get("multiplier", 2))))
         except ValueError:
-            self.row_mult.set_selected(0)
-        self.row_flow.set_value(float(snap.get("flow_scale", 0)))
-        self.row_perf.set_active(bool(snap.get("performance", False)))
-        self.row_hdr.set_active(bool(snap.get("hdr", False)))
-        self.row_present.set_text(str(snap.get("present_mode", "")))
-        self.row_lsfg_proc.set_text(str(snap.get("lsfg_process", "")))
-        self.row_extra_layers.set_text(str(snap.get("extra_layers", "")))
-        self.row_mangohud.set_active(bool(snap.get("mangohud", False)))
+            rows.mult.set_selected(0)
+        rows.flow.set_value(float(snap.get("flow_scale", 0)))
+        rows.perf.set_active(bool(snap.get("performance", False)))
+        rows.hdr.set_active(bool(snap.get("hdr", False)))
+        rows.present.set_text(str(snap.get("present_mode", "")))
+        rows.lsfg_proc.set_text(str(snap.get("lsfg_process", "")))
+        rows.extra_layers.set_text(str(snap.get("extra_layers", "")))
+        rows.mangohud.set_active(bool(snap.get("mangohud", False)))
+        rows.detect.set_active(bool(snap.get("detect_process", False)))
+        rows.monitor.set_active(bool(snap.get("monitor", False)))
+        rows.monitor_interval.set_value(float(snap.get("monitor_interval", 1.0)))
 
     def _on_fav_save(self, mode: str):
-        name = self.fav_name_entry.get_text().strip() or "Preset"
-        entry: dict = {"name": name, "mode": mode, "target": "", "options": self._collect_options_snapshot()}
+        fav_rows = self.fav_rows[mode]
+        name = fav_rows.name_entry.get_text().strip() or "Preset"
+        entry: dict = {"name": name, "mode": mode, "target": "", "options": self._collect_options_snapshot(mode)}
         if mode == "flatpak":
-            idx = int(self.dd_flatpak.get_selected())
-            entry["target"] = self._flatpak_ids[idx] if (0 <= idx < len(self._flatpak_ids)) else ""
-            entry["options"]["extra_args"] = self.row_flatpak_args.get_text().strip()
+            entry["target"] = self._selected_flatpak() or ""
         else:
             entry["target"] = self.row_host_cmd.get_text().strip()
-            entry["options"]["extra_args"] = self.row_host_args.get_text().strip()
 
         # overwrite if name+mode exists
-        replaced = False
-        for i, f in enumerate(self.settings.favorites):
-            if f.get("name")==name and f.get("mode")==mode:
-                self.settings.favorites[i] = entry
-                replaced = True
-                break
+        replaced = name in self._fav_names(mode)
+        put_favorite(self.settings, entry)
+        self._sync_exports()
         if not replaced:
-            self.settings.favorites.append(entry)
-            self.fav_list.append(name)
+            self._fav_order[mode].append(name)
+            fav_rows.names.append(name)
+            self._refresh_fav_choices()
 
-        save_settings(self.settings)
         self._message("OK", tr(self.settings.lang, "fav_exists") if replaced else tr(self.settings.lang, "fav_saved"))
 
     def _selected_fav_entry(self, mode: str) -> dict | None:
-        idx = int(self.dd_fav.get_selected())
+        idx = int(self.fav_rows[mode].dropdown.get_selected())
         if idx < 0:
             return None
         # filter by mode
-        names = [f["name"] for f in self.settings.favorites if f.get("mode")==mode]
+        names = self._fav_names(mode)
         if idx >= len(names):
             return None
         name = names[idx]
@@ -740,7 +1250,11 @@ class MainWindow(Adw.ApplicationWindow):
         fav = self._selected_fav_entry(mode)
         if not fav:
             return
-        self._apply_options_snapshot(fav.get("options", {}))
+        # an explicitly loaded favorite wins over the rules for its target (selecting the target
+        # below would otherwise re-apply the rule's favorite on top of it)
+        self._explicit_target[mode] = fav.get("target", "")
+        self._auto_applied[mode] = (fav.get("target", ""), fav.get("name", ""))
+        self._apply_options_snapshot(mode, fav.get("options", {}))
         if mode == "flatpak":
             target = fav.get("target","")
             if target and target in self._flatpak_ids:
@@ -750,25 +1264,237 @@ class MainWindow(Adw.ApplicationWindow):
             self.row_host_cmd.set_text(fav.get("target",""))
             self.row_host_args.set_text(fav.get("options",{}).get("extra_args",""))
 
+    @traced("launch.favorite")
     def _on_fav_run(self, mode: str):
-        self._on_fav_load(mode)
-        if mode == "flatpak":
-            self._on_launch_flatpak(None)
-        else:
-            self._on_launch_host(None)
+        self._pending_fav = self._selected_fav_entry(mode)
+        try:
+            self._on_fav_load(mode)
+            if mode == "flatpak":
+                self._on_launch_flatpak(None)
+            else:
+                self._on_launch_host(None)
+        finally:
+            self._pending_fav = None
 
     def _on_fav_delete(self, mode: str):
         fav = self._selected_fav_entry(mode)
         if not fav:
             return
         name = fav["name"]
-        self.settings.favorites = [f for f in self.settings.favorites if not (f.get("mode")==mode and f.get("name")==name)]
-        save_settings(self.settings)
+        remove_favorite(self.settings, mode, name)
+        self._sync_exports()
         # rebuild dropdown model
-        new_names = [f["name"] for f in self.settings.favorites if f.get("mode")==mode]
-        self.fav_list.splice(0, self.fav_list.get_n_items(), [])
-        for n in new_names:
-            self.fav_list.append(n)
+        names = self.fav_rows[mode].names
+        names.splice(0, names.get_n_items(), self._rank_favs(mode))
+        self._refresh_fav_choices()
+
+    def _sync_exports(self):
+        # once launchers were exported, keep them matching the favorites (incremental, cheap)
+        from lsfgvk_export import export_favorites, exports_enabled
+        if exports_enabled():
+            try:
+                export_favorites(self.settings)
+            except OSError as e:
+                self._message(self._t("error"), str(e))
+
+    # ------------- Favorite choices (launch groups + rules editors share one model)
+    def _refresh_fav_choices(self):
+        self._fav_choices = list(self.settings.favorites)
+        labels = [f"{f.get('name', '')}  ({self._t('tab_' + f.get('mode', 'host'))})" for f in self._fav_choices]
+        self.fav_choice_list.splice(0, self.fav_choice_list.get_n_items(), labels)
+
+    # ------------- Launch groups (edit/save/load/run/delete)
+    def _member_summary(self, i: int, m: GroupMember) -> str:
+        parts = []
+        if m.delay:
+            parts.append(f"{self._t('grp_delay')}: {m.delay:g}")
+        if m.after >= 0:
+            parts.append(f"{self._t('grp_after')} #{m.after + 1}")
+        ready = self._t(f"ready_{m.ready}")
+        if m.ready == "seconds":
+            ready += f" ({m.ready_timeout:g} s)"
+        elif m.ready == "window":
+            ready += f" (≤ {m.ready_timeout:g} s)"
+        parts.append(f"{self._t('grp_ready')}: {ready}")
+        return " · ".join(parts)
+
+    def _rebuild_group_member_rows(self):
+        for row in self._group_member_rows:
+            self.grp_members.remove(row)
+        self._group_member_rows = []
+        for i, m in enumerate(self._group_members):
+            row = Adw.ActionRow(title=f"#{i + 1}  {m.favorite}  ({self._t('tab_' + m.mode)})", subtitle=self._member_summary(i, m))
+            btn = Gtk.Button(icon_name="user-trash-symbolic", valign=Gtk.Align.CENTER)
+            btn.connect("clicked", lambda _b, i=i: self._on_group_remove_member(i))
+            row.add_suffix(btn)
+            self.grp_members.add(row)
+            self._group_member_rows.append(row)
+
+    def _on_group_add_member(self, _btn):
+        idx = int(self.row_member_fav.get_selected())
+        if idx < 0 or idx >= len(self._fav_choices):
+            return
+        fav = self._fav_choices[idx]
+        n = len(self._group_members)
+        self._group_members.append(GroupMember(
+            favorite=fav.get("name", ""),
+            mode=fav.get("mode", "host"),
+            delay=float(self.row_member_delay.get_value()),
+            after=n - 1 if (n > 0 and self.row_member_after.get_active()) else -1,
+            ready=READY_MODES[self.row_member_ready.get_selected()],
+            ready_timeout=float(self.row_member_timeout.get_value()),
+        ))
+        self._rebuild_group_member_rows()
+
+    def _on_group_remove_member(self, i: int):
+        if not (0 <= i < len(self._group_members)):
+            return
+        del self._group_members[i]
+        # keep dependencies pointing at the same members
+        for m in self._group_members:
+            if m.after == i:
+                m.after = -1
+            elif m.after > i:
+                m.after -= 1
+        self._rebuild_group_member_rows()
+
+    def _selected_group(self) -> LaunchGroup | None:
+        idx = int(self.dd_group.get_selected())
+        if idx < 0 or idx >= len(self.settings.groups):
+            return None
+        return group_from_dict(self.settings.groups[idx])
+
+    def _on_group_save(self, _btn):
+        name = self.row_group_name.get_text().strip() or "Group"
+        if not self._group_members:
+            self._message(self._t("error"), self._t("grp_empty"))
+            return
+        group = LaunchGroup(name=name, members=list(self._group_members), max_parallel=int(self.row_group_parallel.get_value()))
+        try:
+            validate_group(group)
+        except ValueError as e:
+            self._message(self._t("error"), str(e))
+            return
+        if not any(g.get("name") == name for g in self.settings.groups):
+            self.group_names.append(name)
+        put_group(self.settings, group_to_dict(group))
+        self._message("OK", self._t("grp_saved"))
+
+    def _on_group_load(self, _btn):
+        group = self._selected_group()
+        if group is None:
+            return
+        self.row_group_name.set_text(group.name)
+        self.row_group_parallel.set_value(group.max_parallel)
+        self._group_members = list(group.members)
+        self._rebuild_group_member_rows()
+
+    @traced("launch.group")
+    def _on_group_run(self, _btn):
+        group = self._selected_group()
+        if group is None:
+            return
+        running = self._group_runs.get(group.name)
+        if running and not running.wait(0):
+            return
+        try:
+            run = GroupRun(self.settings, group, on_event=lambda i, st, d: GLib.idle_add(self._on_group_event, group, i, st, d))
+        except ValueError as e:
+            self._message(self._t("error"), str(e))
+            return
+        self._group_runs[group.name] = run.start()
+
+    def _on_group_event(self, group: LaunchGroup, i: int, state: str, detail: str):
+        # main thread (GLib.idle_add)
+        if i < 0:
+            run = self._group_runs.get(group.name)
+            failed = len(run.failed) if run else 0
+            text = f"{group.name}: {self._t('grp_done')}" + (f" ({failed} {self._t('error').lower()})" if failed else "")
+        else:
+            m = group.members[i]
+            text = f"{group.name} · #{i + 1} {m.favorite}: {self._t('grp_state_' + state)}" + (f" ({detail})" if detail else "")
+        self.row_group_status.set_subtitle(text)
+        return False
+
+    def _on_group_delete(self, _btn):
+        idx = int(self.dd_group.get_selected())
+        if idx < 0 or idx >= len(self.settings.groups):
+            return
+        remove_group(self.settings, self.settings.groups[idx].get("name", ""))
+        self.group_names.splice(0, self.group_names.get_n_items(), [g.get("name", "") for g in self.settings.groups])
+
+    # ------------- Auto-profile rules
+    def _apply_auto_profile(self, mode: str):
+        """
+        Applies the favorite picked by the rules for the current target. A profile is applied
+        once per (target, favorite): later manual tweaks are kept until the target changes.
+        """
+        if mode not in self.fav_rows:
+            return   # page still being built: applied once its favorites group exists
+        target = (self._selected_flatpak() if mode == "flatpak" else self.row_host_cmd.get_text().strip()) or ""
+        if not target or self._explicit_target.get(mode) == target:
+            return
+        self._explicit_target.pop(mode, None)   # another target: the rules apply again
+        args_row = self.row_flatpak_args if mode == "flatpak" else self.row_host_args
+        with span("rules.apply", mode=mode):
+            found = resolve_profile(self.settings, mode, target, args_row.get_text(),
+                                    self.opt_rows[mode].lsfg_proc.get_text())
+        auto_row = self.fav_rows[mode].auto
+        if found is None:
+            self._auto_applied[mode] = None
+            auto_row.set_subtitle(self._t("auto_none"))
+            return
+        rule, fav = found
+        key = (target, fav.get("name", ""))
+        if self._auto_applied.get(mode) == key:
+            return
+        self._auto_applied[mode] = key
+        self._apply_options_snapshot(mode, fav.get("options", {}))
+        auto_row.set_subtitle(f"{fav.get('name', '')}  ·  {self._t('rule_field_' + rule.field)} “{rule.pattern}”")
+
+    def _rule_summary(self, rule: Rule) -> str:
+        return f"→ {rule.favorite}  ({self._t('tab_' + rule.mode)}) · {self._t('rule_priority')}: {rule.priority}"
+
+    def _rebuild_rule_rows(self):
+        for row in self._rule_rows:
+            self.grp_rules.remove(row)
+        self._rule_rows = []
+        for data in self.settings.rules:
+            rule = rule_from_dict(data)
+            row = Adw.ActionRow(title=f"{self._t('rule_field_' + rule.field)} · {rule.kind} “{rule.pattern}”", subtitle=self._rule_summary(rule))
+            btn = Gtk.Button(icon_name="user-trash-symbolic", valign=Gtk.Align.CENTER)
+            btn.connect("clicked", lambda _b, key=rule_key(data): self._on_rule_delete(key))
+            row.add_suffix(btn)
+            self.grp_rules.add(row)
+            self._rule_rows.append(row)
+
+    def _on_rule_add(self, _btn):
+        idx = int(self.row_rule_fav.get_selected())
+        if idx < 0 or idx >= len(self._fav_choices):
+            self._message(self._t("error"), self._t("rule_no_fav"))
+            return
+        fav = self._fav_choices[idx]
+        rule = Rule(
+            field=FIELDS[self.row_rule_field.get_selected()],
+            kind=KINDS[self.row_rule_kind.get_selected()],
+            pattern=self.row_rule_pattern.get_text().strip(),
+            favorite=fav.get("name", ""),
+            mode=fav.get("mode", "host"),
+            priority=int(self.row_rule_priority.get_value()),
+        )
+        try:
+            validate_rule(rule)
+        except ValueError as e:
+            self._message(self._t("error"), str(e))
+            return
+        put_rule(self.settings, rule_to_dict(rule))
+        self._auto_applied.clear()
+        self._rebuild_rule_rows()
+
+    def _on_rule_delete(self, key: str):
+        remove_rule(self.settings, key)
+        self._auto_applied.clear()
+        self._rebuild_rule_rows()
 
 # ---------------- Application ----------------
 
@@ -783,11 +1509,19 @@ class App(Adw.Application):
         self._add_action("open_config", self._open_config)
         self._add_action("export_settings", self._export_settings)
         self._add_action("import_settings", self._import_settings)
+        self._add_action("export_launchers", self._export_launchers)
+        self._add_action("verify_launchers", self._verify_launchers)
         self._add_action("reset_settings", self._reset_settings)
         self._add_action("link_lsfg", lambda *_: self._open_url("https://github.com/PancakeTAS/lsfg-vk"))
         self._add_action("link_mangohud", lambda *_: self._open_url("https://github.com/flightlessmango/MangoHud"))
         self._add_action("link_goverlay", lambda *_: self._open_url("https://github.com/benjamimgois/goverlay"))
 
+        # Tracing toggle (checkbox in menu) + export
+        trace_act = Gio.SimpleAction.new_stateful("trace_record", None, GLib.Variant.new_boolean(TRACER.enabled))
+        trace_act.connect("change-state", self._on_trace_toggle)
+        self.add_action(trace_act)
+        self._add_action("trace_export", self._export_trace)
+
         self.settings = load_settings()
         self.win: MainWindow | None = None
 
@@ -805,10 +1539,12 @@ class App(Adw.Application):
         self.do_activate()
 
     def _open_config(self, *_):
+        CONFIG_DIR.mkdir(parents=True, exist_ok=True)
         Gio.AppInfo.launch_default_for_uri(f"file://{CONFIG_DIR}", None)
 
     def _export_settings(self, *_):
         try:
+            CONFIG_DIR.mkdir(parents=True, exist_ok=True)
             out = CONFIG_DIR / "settings.export.json"
             out.write_text(json.dumps(asdict(self.settings), indent=2, ensure_ascii=False), encoding="utf-8")
             self._info(tr(self.settings.lang, "export_done") + f"\n{out}")
@@ -819,14 +1555,10 @@ class App(Adw.Application):
         try:
             imp = CONFIG_DIR / "settings.export.json"
             data = json.loads(imp.read_text(encoding="utf-8"))
-            self.settings = Settings(
-                lang=data.get("lang","fr"),
-                last_flatpak=data.get("last_flatpak",""),
-                last_host_cmd=data.get("last_host_cmd",""),
-                favorites=data.get("favorites",[]),
-                options=Options(**data.get("options",{})),
-            )
+            self.settings = settings_from_dict(data)
             save_settings(self.settings)
+            replace_collections(self.settings)
+            self._sync_exports()
             self._info(tr(self.settings.lang, "import_done"))
             # Re-open window to refresh UI
             if self.win:
@@ -835,12 +1567,42 @@ class App(Adw.Application):
         except Exception as e:
             self._error(str(e))
 
+    def _sync_exports(self):
+        # the whole favorites collection was replaced: exported launchers follow (see MainWindow)
+        from lsfgvk_export import export_favorites, exports_enabled
+        if exports_enabled():
+            export_favorites(self.settings)
+
+    def _export_launchers(self, *_):
+        from lsfgvk_export import export_favorites
+        try:
+            res = export_favorites(self.settings)
+            self._info(tr(self.settings.lang, "launchers_done").format(
+                written=len(res.written), unchanged=res.unchanged, removed=len(res.removed)) + f"\n{res.directory}")
+        except Exception as e:
+            self._error(str(e))
+
+    def _verify_launchers(self, *_):
+        from lsfgvk_export import EXPORT_DIR, verify_exports
+        try:
+            problems = verify_exports(self.settings)
+        except Exception as e:
+            self._error(str(e))
+            return
+        if problems:
+            self._info(tr(self.settings.lang, "launchers_bad") + "\n\n" + "\n\n".join(problems[:10]))
+        else:
+            self._info(tr(self.settings.lang, "launchers_ok") + f"\n{EXPORT_DIR}")
+
     def _reset_settings(self, *_):
         try:
             if CONFIG_FILE.exists():
                 CONFIG_FILE.unlink()
+            store().destroy()
             self.settings = Settings()
             save_settings(self.settings)
+            replace_collections(self.settings)   # empty collections + rules revision bump (matcher cache)
+            self._sync_exports()
             self._info(tr(self.settings.lang, "reset_done"))
             if self.win:
                 self.win.destroy()
@@ -848,6 +1610,20 @@ class App(Adw.Application):
         except Exception as e:
             self._error(str(e))
 
+    def _on_trace_toggle(self, act: Gio.SimpleAction, value: GLib.Variant):
+        act.set_state(value)
+        TRACER.enabled = value.get_boolean()
+
+    def _export_trace(self, *_):
+        if not TRACER.events():
+            self._info(tr(self.settings.lang, "trace_empty"))
+            return
+        try:
+            trace_path, summary_path = TRACER.export_bundle(TRACE_DIR)
+            self._info(tr(self.settings.lang, "trace_exported") + f"\n{trace_path}\n{summary_path}\n\n" + TRACER.format_summary())
+        except Exception as e:
+            self._error(str(e))
+
     def _open_url(self, url: str):
         Gio.AppInfo.launch_default_for_uri(url, None)
 
@@ -864,14 +1640,40 @@ class App(Adw.Application):
         dlg.present()
 
     # ---- Application Lifecycle
+    @traced("app.activate")
     def do_activate(self):
         if not self.win:
             self.win = MainWindow(self, self.settings)
         self.win.present()
 
 def main():
+    parser = argparse.ArgumentParser(prog="lsfgvk-launcher")
+    parser.add_argument("--run", metavar="NAME", help="launch a favorite without opening the window")
+    parser.add_argument("--mode", choices=("flatpak", "host"), help="favorite mode when names collide")
+    parser.add_argument("--wait", action="store_true", help="with --run: wait and return the app's exit code")
+    parser.add_argument("--run-group", metavar="NAME", help="start a launch group without opening the window")
+    parser.add_argument("--launch", metavar="TARGET", help="launch a Flatpak app id / host command with its auto-profile (needs --mode)")
+    parser.add_argument("--args", default="", help="with --launch: extra arguments for the target")
+    parser.add_argument("--export", nargs="?", const="", metavar="DIR",
+                        help="write every favorite as a shell script + .desktop file (default: config dir/exports)")
+    parser.add_argument("--verify-export", nargs="?", const="", metavar="DIR",
+                        help="diff the exported launchers against what the launcher would run")
+    args = parser.parse_args()
+    if args.run:
+        return run_favorite(args.run, args.mode, wait=args.wait)
+    if args.run_group:
+        return run_group(args.run_group)
+    if args.launch:
+        if not args.mode:
+            parser.error("--launch needs --mode flatpak|host")
+        return launch_target(args.mode, args.launch, args.args, wait=args.wait)
+    if args.export is not None or args.verify_export is not None:
+        from lsfgvk_export import run_export
+        if args.export is not None:
+            return run_export(args.export or None)
+        return run_export(args.verify_export or None, verify=True)
     app = App()
-    app.run([])
+    return app.run([])
 
 if __name__ == "__main__":
-    main()
+    raise SystemExit(main())
@@ -0,0 +1,336 @@
+# SPDX-License-Identifier: MIT
+#
+# LSFG-VK Launcher — auto-profile rules
+# - A rule maps a glob/regex on one launch field (Flatpak app id, host command, Steam appid,
+#   LSFG_PROCESS) to a favorite, with a priority (higher wins, then the earlier rule)
+# - All rules are compiled once into a Matcher: literal and "prefix*" globs go into a prefix trie
+#   per field, everything else into one merged regex per field (alternatives ordered by rank,
+#   so the first alternative that matches is the best one)
+# - The compiled Matcher is cached and only rebuilt when the rules change
+#
+# Stored in Settings.rules as plain dicts (same style as favorites/groups).
+
+import os
+import re
+import fnmatch
+from dataclasses import dataclass, asdict
+
+from lsfgvk_trace import span
+from lsfgvk_core import (
+    Settings, LaunchError, find_favorite, launch_favorite, load_settings, rules_revision, split_args,
+)
+
+FIELDS = ["flatpak", "host", "steam", "process"]   # UI order
+KINDS = ["glob", "regex"]
+GLOB_SPECIALS = "*?["
+
+@dataclass
+class Rule:
+    field: str          # one of FIELDS
+    pattern: str
+    favorite: str       # favorite name
+    mode: str           # favorite mode ("flatpak" | "host")
+    kind: str = "glob"  # "glob" (whole value) | "regex" (searched in the value)
+    priority: int = 0
+
+def rule_from_dict(data: dict) -> Rule:
+    known = Rule.__dataclass_fields__
+    return Rule(**{k: v for k, v in data.items() if k in known})
+
+def rule_to_dict(rule: Rule) -> dict:
+    return asdict(rule)
+
+def validate_rule(rule: Rule) -> None:
+    if rule.field not in FIELDS:
+        raise ValueError(f"unknown rule field '{rule.field}'")
+    if rule.kind not in KINDS:
+        raise ValueError(f"unknown rule kind '{rule.kind}'")
+    if not rule.pattern:
+        raise ValueError("empty pattern")
+    if rule.kind == "regex":
+        try:
+            re.compile(rule.pattern)
+            re.compile(search_body(rule.pattern))   # the form the Matcher compiles
+        except re.error as e:
+            raise ValueError(f"invalid regex '{rule.pattern}': {e}") from None
+
+# ---------------- Subjects ----------------
+
+_STEAM_APPID = re.compile(r"(?:steam://(?:rungameid|run)/|-applaunch\s+|SteamAppId=)(\d+)")
+
+def steam_appid(text: str) -> str:
+    m = _STEAM_APPID.search(text)
+    return m.group(1) if m else ""
+
+def subjects_for(mode: str, target: str, extra_args: str = "", process: str = "") -> dict[str, tuple[str, ...]]:
+    """
+    Values a launch exposes to the rules. Host commands are matched as typed and by the
+    basename of their first word ("/usr/bin/retroarch -L core" also matches "retroarch");
+    a command that does not parse (unbalanced quotes while typing) only as typed.
+    """
+    subjects: dict[str, tuple[str, ...]] = {}
+    target = target.strip()
+    if mode == "flatpak":
+        subjects["flatpak"] = (target,)
+    elif target:
+        try:
+            words = split_args(target) or [target]
+        except ValueError:
+            words = [target]
+        base = os.path.basename(words[0])
+        subjects["host"] = (target,) if base == target else (target, base)
+    appid = steam_appid(f"{target} {extra_args}")
+    if appid:
+        subjects["steam"] = (appid,)
+    if process.strip():
+        subjects["process"] = (process.strip(),)
+    return subjects
+
+# ---------------- Compiled matcher ----------------
+
+_RE_META = set(".^$*+?{}[]|()\\")
+_GLOBAL_FLAGS = re.compile(r"\(\?([aiLmsux]+)\)")
+# \N, (?P=name) and (?(N)…) refer to groups by number/name: they break once merged with other rules
+_GROUP_REF = re.compile(r"(?<!\\)(?:\\\\)*\\[1-9]|\(\?P=|\(\?\(")
+
+def search_body(pattern: str) -> str:
+    """
+    Regex searched anywhere in the value, as one anchored body that can be merged with others.
+    Leading global flags ("(?i)retroarch") become a scoped group: they are only valid at the
+    very start of a whole pattern.
+    """
+    flags = ""
+    m = _GLOBAL_FLAGS.match(pattern)
+    while m:
+        flags += m.group(1)
+        pattern = pattern[m.end():]
+        m = _GLOBAL_FLAGS.match(pattern)
+    return f"(?s:.*?(?{flags}:{pattern}))" if flags else f"(?s:.*?(?:{pattern}))"
+
+def _regex_lead(pattern: str) -> str:
+    """
+    Literal text every match of the regex must contain (its leading literal run), or "" when
+    that cannot be told cheaply (alternation, groups or classes first, inline flags…).
+    """
+    if "|" in pattern:
+        return ""
+    out, i = [], 1 if pattern.startswith("^") else 0
+    while i < len(pattern):
+        c = pattern[i]
+        if c == "\\" and i + 1 < len(pattern) and not pattern[i + 1].isalnum():
+            out.append(pattern[i + 1])
+            i += 2
+            continue
+        if c in _RE_META:
+            if c in "*?{" and out:
+                out.pop()   # the last literal is optional/repeated
+            break
+        out.append(c)
+        i += 1
+    return "".join(out)
+
+class _Node:
+    __slots__ = ("children", "exact", "prefix", "checks")
+
+    def __init__(self):
+        self.children: dict[str, _Node] = {}
+        self.exact: tuple | None = None    # best (rank, index) for the literal ending here
+        self.prefix: tuple | None = None   # best (rank, index) for "<path>*"
+        self.checks: list | None = None    # [rank, index, regex] candidates to verify
+
+def _better(a: tuple | None, b: tuple) -> tuple:
+    return b if a is None or b[0] > a[0] else a
+
+class Matcher:
+    """
+    rank = (priority, -position): higher is better, so ties go to the earlier rule.
+
+    Per field:
+      - prefix trie: literal globs (exact), "literal*" globs (prefix), and other globs under
+        their literal prefix (candidates verified with their own regex)
+      - substring trie: regex rules under their leading literal, walked from every offset
+      - one merged regex for what is left (alternatives in rank order)
+    """
+
+    def __init__(self, rules: list[Rule]):
+        self.rules = rules
+        self._tries: dict[str, _Node] = {}
+        self._subs: dict[str, _Node] = {}
+        self._regex: dict[str, list[tuple[re.Pattern, dict[int, int] | int]]] = {}
+        pending: dict[str, list[tuple[tuple, int, str]]] = {}
+        for idx, rule in enumerate(rules):
+            rank = (int(rule.priority), -idx)
+            p = rule.pattern
+            if rule.kind == "glob":
+                lead = p[:min([p.index(c) for c in GLOB_SPECIALS if c in p], default=len(p))]
+                if lead == p:
+                    node = self._node(self._tries, rule.field, lead)
+                    node.exact = _better(node.exact, (rank, idx))
+                elif p == lead + "*":
+                    node = self._node(self._tries, rule.field, lead)
+                    node.prefix = _better(node.prefix, (rank, idx))
+                elif lead:
+                    self._add_check(self._tries, rule.field, lead, [rank, idx, fnmatch.translate(p)])
+                else:
+                    pending.setdefault(rule.field, []).append((rank, idx, fnmatch.translate(p)))
+            else:
+                lead = _regex_lead(p)
+                if len(lead) >= 2:
+                    self._add_check(self._subs, rule.field, lead, [rank, idx, p])
+                else:
+                    pending.setdefault(rule.field, []).append((rank, idx, search_body(p)))
+        for field, alts in pending.items():
+            alts.sort(key=lambda a: a[0], reverse=True)
+            # group references would point into another rule's groups once merged: compiled alone
+            alone, merged = [], []
+            for a in alts:
+                (alone if _GROUP_REF.search(a[2]) else merged).append(a)
+            compiled = self._regex[field] = []
+            if merged:
+                try:
+                    compiled.append(self._merge(merged))
+                except re.error:
+                    alone += merged
+            for _rank, idx, body in alone:
+                try:
+                    compiled.append((re.compile(body), idx))
+                except re.error:
+                    continue   # one broken rule must not take the others (or every launch) down
+
+    @staticmethod
+    def _node(tries: dict[str, _Node], field: str, literal: str) -> _Node:
+        node = tries.setdefault(field, _Node())
+        for ch in literal:
+            node = node.children.setdefault(ch, _Node())
+        return node
+
+    def _add_check(self, tries: dict[str, _Node], field: str, literal: str, cand: list) -> None:
+        node = self._node(tries, field, literal)
+        if node.checks is None:
+            node.checks = []
+        node.checks.append(cand)
+
+    @staticmethod
+    def _merge(alts: list[tuple[tuple, int, str]]) -> tuple[re.Pattern, dict[int, int]]:
+        # group number of each alternative's outer group -> rule index
+        parts, groups, gi = [], {}, 1
+        for _rank, idx, body in alts:
+            groups[gi] = idx
+            parts.append(f"({body})")
+            gi += 1 + re.compile(body).groups
+        return re.compile("|".join(parts)), groups
+
+    @staticmethod
+    def _verify(best: tuple | None, checks: list, value: str, search: bool) -> tuple | None:
+        for cand in checks:
+            rank, idx, regex = cand
+            if best is not None and rank <= best[0]:
+                continue
+            if isinstance(regex, str):
+                # compiled on first use: rebuilding the matcher stays cheap with thousands of rules
+                regex = cand[2] = re.compile(regex)
+            if (regex.search(value) if search else regex.match(value)):
+                best = (rank, idx)
+        return best
+
+    def _best_in(self, field: str, value: str) -> tuple | None:
+        best = None
+        node = self._tries.get(field)
+        if node is not None:
+            if node.prefix:
+                best = node.prefix
+            for ch in value:
+                node = node.children.get(ch)
+                if node is None:
+                    break
+                if node.prefix:
+                    best = _better(best, node.prefix)
+                if node.checks:
+                    best = self._verify(best, node.checks, value, search=False)
+            else:
+                if node.exact:
+                    best = _better(best, node.exact)
+        root = self._subs.get(field)
+        if root is not None:
+            for start in range(len(value)):
+                node = root
+                for ch in value[start:]:
+                    node = node.children.get(ch)
+                    if node is None:
+                        break
+                    if node.checks:
+                        best = self._verify(best, node.checks, value, search=True)
+        for regex, groups in self._regex.get(field, ()):
+            m = regex.match(value)
+            if m:
+                idx = groups if isinstance(groups, int) else groups[m.lastindex]
+                best = _better(best, ((int(self.rules[idx].priority), -idx), idx))
+        return best
+
+    def match(self, subjects: dict[str, tuple[str, ...]]) -> Rule | None:
+        best = None
+        for field, values in subjects.items():
+            for value in values:
+                found = self._best_in(field, value)
+                if found is not None:
+                    best = _better(best, found)
+        return self.rules[best[1]] if best else None
+
+_CACHE: tuple[tuple[int, int], Matcher] | None = None
+
+def matcher_for(settings: Settings) -> Matcher:
+    """
+    Compiled matcher for settings.rules; rebuilt only after put_rule/remove_rule/load/import.
+    """
+    global _CACHE
+    key = (id(settings.rules), rules_revision())
+    if _CACHE is None or _CACHE[0] != key:
+        with span("rules.compile", rules=len(settings.rules)):
+            rules = []
+            for data in settings.rules:
+                rule = rule_from_dict(data)
+                try:
+                    validate_rule(rule)
+                except ValueError:
+                    continue   # hand-edited/broken rule: ignore rather than break every launch
+                rules.append(rule)
+            _CACHE = (key, Matcher(rules))
+    return _CACHE[1]
+
+def resolve_profile(settings: Settings, mode: str, target: str, extra_args: str = "",
+                    process: str = "") -> tuple[Rule, dict] | None:
+    """
+    (rule, favorite) that applies to this launch, or None.
+    """
+    rule = matcher_for(settings).match(subjects_for(mode, target, extra_args, process))
+    if rule is None:
+        return None
+    fav = find_favorite(settings, rule.favorite, rule.mode)
+    return (rule, fav) if fav is not None else None
+
+# ---------------- Headless ----------------
+
+def launch_target(mode: str, target: str, extra_args: str = "", wait: bool = False) -> int:
+    """
+    Entry point for `lsfgvk-launcher --launch TARGET --mode M`: applies the matching
+    auto-profile (or the default options) to an arbitrary target.
+    """
+    settings = load_settings()
+    found = resolve_profile(settings, mode, target, extra_args)
+    if found:
+        rule, fav = found
+        options = dict(fav.get("options", {}))
+        name = fav.get("name", "")
+        print(f"lsfgvk-launcher: auto-profile '{name}' ({rule.field} {rule.kind} '{rule.pattern}')")
+    else:
+        options = asdict(settings.options)
+        name = ""
+    if extra_args:
+        options["extra_args"] = extra_args
+    entry = {"name": name, "mode": mode, "target": target, "options": options}
+    try:
+        proc = launch_favorite(settings, entry)
+    except LaunchError as e:
+        print(f"lsfgvk-launcher: {e}")
+        return 1
+    return proc.wait() if wait else 0
@@ -0,0 +1,161 @@
+# SPDX-License-Identifier: MIT
+#
+# LSFG-VK Launcher — per-session resource sampler (app side)
+# - The host agent (`lsfgvk_hostagent.py sample`) streams tree-wide samples: CPU%, RSS,
+#   threads, context-switch and I/O rates
+# - Each metric goes into a fixed-size ring buffer backed by array('d'): memory stays bounded
+#   however long the game runs; the sparklines redraw straight from it
+# - Running aggregates (mean/max) give the session summary, saved to the launch history when
+#   the game exits so presets can be compared
+#
+# GTK-free: the window only reads Session.rings / Session.summary() from the main thread.
+
+import time
+import array
+import threading
+
+from lsfgvk_trace import span
+from lsfgvk_core import history
+from lsfgvk_history import options_hash
+from lsfgvk_hostagent import stream_agent
+
+METRICS = ["cpu", "rss", "threads", "csw", "io_r", "io_w"]
+RING_SIZE = 300            # samples kept per metric (5 min at the default 1 s interval)
+DEFAULT_INTERVAL = 1.0
+CPU_BUDGET = 0.5           # agent CPU % the sampling interval adapts to
+
+class Ring:
+    """
+    Fixed-size ring buffer of floats. push() is O(1) and allocation free.
+    """
+    __slots__ = ("_buf", "_head", "_len")
+
+    def __init__(self, size: int):
+        self._buf = array.array("d", bytes(8 * size))
+        self._head = 0      # next write position
+        self._len = 0
+
+    def __len__(self) -> int:
+        return self._len
+
+    @property
+    def size(self) -> int:
+        return len(self._buf)
+
+    def push(self, value: float) -> None:
+        self._buf[self._head] = value
+        self._head = (self._head + 1) % len(self._buf)
+        if self._len < len(self._buf):
+            self._len += 1
+
+    def last(self) -> float:
+        return self._buf[self._head - 1] if self._len else 0.0
+
+    def values(self) -> list[float]:
+        """Oldest first."""
+        if self._len < len(self._buf):
+            return self._buf[:self._len].tolist()
+        return self._buf[self._head:].tolist() + self._buf[:self._head].tolist()
+
+def sparkline_points(ring: Ring, width: int, height: int) -> list[tuple[float, float]]:
+    """
+    Polyline of the ring scaled to width x height (1.5 px margin), empty below 2 samples.
+    x is scaled to the ring capacity: the line grows from the left, then scrolls.
+    """
+    values = ring.values()
+    if len(values) < 2:
+        return []
+    top = max(values) or 1.0
+    step = (width - 2) / max(1, ring.size - 1)
+    x0 = width - 1 - step * (len(values) - 1)
+    scale = (height - 3) / top
+    base = height - 1.5
+    return [(x0 + i * step, base - v * scale) for i, v in enumerate(values)]
+
+class Session:
+    """
+    One supervised launch. add() is called from the agent reader thread, the rest from any
+    thread (reads of a float array are atomic enough for a sparkline).
+    """
+
+    def __init__(self, mode: str, target: str, preset: str = "", options: dict | None = None,
+                 interval: float = DEFAULT_INTERVAL, ring_size: int = RING_SIZE):
+        self.mode = mode
+        self.target = target
+        self.preset = preset
+        self.options_hash = options_hash(options or {})
+        self.interval = interval
+        self.rings = {m: Ring(ring_size) for m in METRICS}
+        self.samples = 0
+        self.started = time.time()
+        self.ended: float | None = None
+        self.agent_cpu = 0.0        # sampler's own CPU % (host agent, measured)
+        self.agent_interval = interval
+        self.error = ""             # the agent's last stderr line when it failed (no python3, crash…)
+        self._sum = dict.fromkeys(METRICS, 0.0)
+        self._max = dict.fromkeys(METRICS, 0.0)
+        self.stop = threading.Event()
+
+    @property
+    def running(self) -> bool:
+        return self.ended is None
+
+    def add(self, ev: dict) -> None:
+        self.samples += 1
+        for m in METRICS:
+            v = float(ev.get(m, 0.0))
+            self.rings[m].push(v)
+            self._sum[m] += v
+            if v > self._max[m]:
+                self._max[m] = v
+        self.agent_interval = float(ev.get("interval", self.agent_interval))
+
+    def on_event(self, ev: dict) -> bool:
+        """True when a new sample arrived."""
+        kind = ev.get("ev")
+        if kind == "sample":
+            self.add(ev)
+            return True
+        if kind == "stats":
+            self.agent_cpu = float(ev.get("cpu_pct", 0.0))
+        elif kind == "error":
+            self.error = ev.get("message", "")
+        return False
+
+    def summary(self) -> dict:
+        n = max(1, self.samples)
+        out = {
+            "mode": self.mode, "target": self.target, "preset": self.preset,
+            "options_hash": self.options_hash, "start": self.started,
+            "duration": (self.ended or time.time()) - self.started,
+            "samples": self.samples, "interval": self.interval, "agent_cpu": self.agent_cpu,
+        }
+        for m in METRICS:
+            out[f"{m}_avg"] = self._sum[m] / n
+            out[f"{m}_max"] = self._max[m]
+        return out
+
+def start_session(session: Session, host_pid: int, on_sample=None, on_done=None, save: bool = True) -> threading.Thread:
+    """
+    Samples host_pid's tree until it exits (or session.stop is set). on_sample(session) runs on
+    the reader thread after each sample, on_done(session) once the agent stopped; the summary
+    goes to the launch history when save is set and at least one sample came in.
+    """
+    def run():
+        def on_event(ev: dict) -> None:
+            if session.on_event(ev) and on_sample:
+                on_sample(session)
+
+        args = ["sample", "--root", str(host_pid), "--interval", str(session.interval),
+                "--cpu-budget", str(CPU_BUDGET)]
+        with span("sampler.session", target=session.target):
+            stream_agent(args, on_event, session.stop)
+        session.ended = time.time()
+        if save and session.samples:
+            history().add_session(session.summary())
+        if on_done:
+            on_done(session)
+
+    t = threading.Thread(target=run, name=f"sampler-{host_pid}", daemon=True)
+    t.start()
+    return t
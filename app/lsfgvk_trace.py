@@ -0,0 +1,200 @@
+# SPDX-License-Identifier: MIT
+#
+# LSFG-VK Launcher — lightweight span tracing
+# - Spans are recorded into a bounded ring buffer (oldest spans are dropped)
+# - Disabled by default: span() returns a shared no-op context, traced() is a flag check
+# - Export as Chrome/Perfetto trace JSON (chrome://tracing, ui.perfetto.dev) + summary table
+#
+# Enable with LSFGVK_TRACE=1 (or the "Record trace" menu toggle).
+# LSFGVK_TRACE_FILE=/path/trace.json additionally dumps the buffer at exit.
+
+import os
+import json
+import math
+import time
+import atexit
+import threading
+import functools
+from collections import deque
+from pathlib import Path
+
+TRACE_ENV = "LSFGVK_TRACE"
+TRACE_FILE_ENV = "LSFGVK_TRACE_FILE"
+DEFAULT_CAPACITY = 20000
+
+class _NullSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_exc):
+        return False
+
+    def set(self, **_args):
+        pass
+
+_NULL_SPAN = _NullSpan()
+
+class _Span:
+    __slots__ = ("_tracer", "name", "args", "_start")
+
+    def __init__(self, tracer: "Tracer", name: str, args: dict):
+        self._tracer = tracer
+        self.name = name
+        self.args = args
+        self._start = 0
+
+    def __enter__(self):
+        self._start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type, _exc, _tb):
+        end = time.perf_counter_ns()
+        if exc_type is not None:
+            self.args["error"] = exc_type.__name__
+        self._tracer.record(self.name, self._start, end, self.args)
+        return False
+
+    def set(self, **args):
+        """Attach extra args to the span (e.g. result sizes) before it closes."""
+        self.args.update(args)
+
+class Tracer:
+    """
+    Collects (name, start_ns, end_ns, thread_id, args) spans into a ring buffer.
+    deque.append is atomic, so spans from worker threads need no extra lock.
+    """
+
+    def __init__(self, capacity: int = DEFAULT_CAPACITY, enabled: bool = False):
+        self.enabled = enabled
+        self._buf: deque = deque(maxlen=capacity)
+        self._epoch = time.perf_counter_ns()
+        self._wall_epoch = time.time()
+
+    # ---- recording
+    def span(self, name: str, **args):
+        if not self.enabled:
+            return _NULL_SPAN
+        return _Span(self, name, args)
+
+    def record(self, name: str, start_ns: int, end_ns: int, args: dict | None = None) -> None:
+        self._buf.append((name, start_ns, end_ns, threading.get_ident(), args or None))
+
+    def clear(self) -> None:
+        self._buf.clear()
+
+    def events(self) -> list[tuple]:
+        return list(self._buf)
+
+    # ---- export
+    def chrome_trace(self) -> dict:
+        pid = os.getpid()
+        tids: dict[int, int] = {}
+        events = []
+        for name, start, end, ident, args in self.events():
+            tid = tids.setdefault(ident, len(tids) + 1)
+            ev = {
+                "name": name,
+                "cat": name.split(".", 1)[0],
+                "ph": "X",
+                "ts": (start - self._epoch) / 1000.0,
+                "dur": (end - start) / 1000.0,
+                "pid": pid,
+                "tid": tid,
+            }
+            if args:
+                ev["args"] = {k: (v if isinstance(v, (int, float, bool, str)) else str(v)) for k, v in args.items()}
+            events.append(ev)
+        meta = [{"name": "process_name", "ph": "M", "pid": pid, "args": {"name": "lsfgvk-launcher"}}]
+        for ident, tid in tids.items():
+            label = "main" if ident == threading.main_thread().ident else f"worker-{tid}"
+            meta.append({"name": "thread_name", "ph": "M", "pid": pid, "tid": tid, "args": {"name": label}})
+        return {
+            "traceEvents": meta + events,
+            "displayTimeUnit": "ms",
+            "otherData": {"wall_clock_epoch": self._wall_epoch},
+        }
+
+    def export_chrome(self, path: Path) -> Path:
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(self.chrome_trace()), encoding="utf-8")
+        return path
+
+    def summary(self) -> list[tuple[str, int, float, float, float]]:
+        """
+        Returns list of (name, count, p50_ms, p95_ms, max_ms), slowest total first.
+        """
+        durations: dict[str, list[float]] = {}
+        for name, start, end, _ident, _args in self.events():
+            durations.setdefault(name, []).append((end - start) / 1e6)
+        rows = []
+        for name, ds in durations.items():
+            ds.sort()
+            rows.append((name, len(ds), _percentile(ds, 50), _percentile(ds, 95), ds[-1], sum(ds)))
+        rows.sort(key=lambda r: r[5], reverse=True)
+        return [r[:5] for r in rows]
+
+    def format_summary(self) -> str:
+        rows = self.summary()
+        if not rows:
+            return "(no spans recorded)\n"
+        width = max(len("span"), max(len(r[0]) for r in rows))
+        lines = [f"{'span':<{width}}  {'count':>7}  {'p50 ms':>10}  {'p95 ms':>10}  {'max ms':>10}"]
+        for name, count, p50, p95, mx in rows:
+            lines.append(f"{name:<{width}}  {count:>7}  {p50:>10.3f}  {p95:>10.3f}  {mx:>10.3f}")
+        return "\n".join(lines) + "\n"
+
+    def export_bundle(self, directory: Path) -> tuple[Path, Path]:
+        """
+        Writes trace-<timestamp>.json and the matching .txt summary (for bug reports).
+        """
+        stamp = time.strftime("%Y%m%d-%H%M%S")
+        trace_path = self.export_chrome(Path(directory) / f"trace-{stamp}.json")
+        summary_path = trace_path.with_suffix(".txt")
+        summary_path.write_text(self.format_summary(), encoding="utf-8")
+        return trace_path, summary_path
+
+def _percentile(sorted_values: list[float], pct: float) -> float:
+    # nearest-rank on an already sorted list
+    if not sorted_values:
+        return 0.0
+    k = max(0, min(len(sorted_values) - 1, math.ceil(pct / 100.0 * len(sorted_values)) - 1))
+    return sorted_values[k]
+
+def _env_enabled() -> bool:
+    return os.environ.get(TRACE_ENV, "") not in ("", "0", "false", "no")
+
+TRACER = Tracer(enabled=_env_enabled())
+
+def span(name: str, **args):
+    return TRACER.span(name, **args)
+
+def traced(name: str | None = None):
+    """
+    Decorator: wraps the function in a span when tracing is on.
+    When off, the only cost is one attribute lookup and a branch.
+    """
+    def deco(fn):
+        label = name or fn.__qualname__
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not TRACER.enabled:
+                return fn(*args, **kwargs)
+            with _Span(TRACER, label, {}):
+                return fn(*args, **kwargs)
+        return wrapper
+    return deco
+
+def _dump_at_exit() -> None:
+    target = os.environ.get(TRACE_FILE_ENV)
+    if target and TRACER.events():
+        try:
+            TRACER.export_chrome(Path(target))
+            Path(target).with_suffix(".txt").write_text(TRACER.format_summary(), encoding="utf-8")
+        except OSError:
+            pass
+
+atexit.register(_dump_at_exit)
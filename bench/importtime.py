@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+# SPDX-License-Identifier: MIT
+#
+# LSFG-VK Launcher — startup import budget
+# - Runs `python -X importtime` on the launcher module and parses the import tree
+# - Fails when the total import time goes over --budget-ms, when a module that only later
+#   features need (SQLite history, exports, sampler…) is imported at startup, or when
+#   importing touches the config dir
+# - PyGObject itself (gi, typelibs) is not counted: without it (CI, plain box) the launcher's
+#   top-level imports minus gi are measured instead, so one budget fits both
+# - Bytecode is cached in a throwaway prefix and the best run counts: the Flatpak ships
+#   precompiled modules, so a warm cache is what users get
+#
+#   python3 bench/importtime.py                   # best of 5 runs against the default budget
+#   python3 bench/importtime.py --budget-ms 45    # stricter budget
+#   python3 bench/importtime.py --tree            # also print the slowest imports
+
+import os
+import ast
+import sys
+import argparse
+import tempfile
+import subprocess
+import importlib.util
+from pathlib import Path
+
+BENCH_DIR = Path(__file__).resolve().parent
+ROOT = BENCH_DIR.parent
+APP_DIR = ROOT / "app"
+FAKEHOST = BENCH_DIR / "fakehost"
+LAUNCHER = APP_DIR / "lsfgvk_launcher.py"
+
+DEFAULT_BUDGET_MS = 60.0   # coarse net (timings are noisy); the DEFERRED list is the precise check
+# loaded on first use (history query, export, supervised launch…), never before the first frame
+DEFERRED = [
+    "sqlite3", "difflib", "hashlib",
+    "lsfgvk_history", "lsfgvk_export", "lsfgvk_sampler", "lsfgvk_hostagent",
+]
+
+# ---------------- Import tree ----------------
+
+def parse_importtime(stderr: str) -> list[tuple[int, int, int, str]]:
+    """
+    (depth, self_us, cumulative_us, module) per `import time:` line, in output order.
+    """
+    out = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        fields = line[len("import time:"):].split("|")
+        if len(fields) != 3 or not fields[0].strip().isdigit():
+            continue   # header line
+        name = fields[2].rstrip()
+        module = name.lstrip()
+        depth = (len(name) - len(module) - 1) // 2
+        out.append((depth, int(fields[0]), int(fields[1]), module))
+    return out
+
+def startup_imports() -> list[str]:
+    """
+    Modules the launcher imports at top level; gi is left out when PyGObject is missing.
+    """
+    tree = ast.parse(LAUNCHER.read_text(encoding="utf-8"))
+    has_gi = importlib.util.find_spec("gi") is not None
+    names = []
+    for node in tree.body:
+        if isinstance(node, ast.Import):
+            names += [a.name for a in node.names]
+        elif isinstance(node, ast.ImportFrom) and node.module and not node.level:
+            names.append(node.module)
+    if has_gi:
+        return ["lsfgvk_launcher"]
+    return [n for n in dict.fromkeys(names) if n.split(".")[0] != "gi"]
+
+def run_once(modules: list[str], pycache: str) -> tuple[list[tuple[int, int, int, str]], bool]:
+    """
+    One fresh interpreter importing modules; returns the import tree and whether the config
+    dir was created.
+    """
+    with tempfile.TemporaryDirectory(prefix="lsfgvk-importtime-") as cfg:
+        env = dict(os.environ, XDG_CONFIG_HOME=cfg, PYTHONPATH=str(APP_DIR), PYTHONPYCACHEPREFIX=pycache,
+                   PATH=f"{FAKEHOST}{os.pathsep}{os.environ.get('PATH', '')}")
+        for name in ("LSFGVK_TRACE", "PYTHONDONTWRITEBYTECODE"):
+            env.pop(name, None)
+        proc = subprocess.run([sys.executable, "-X", "importtime", "-c", "import " + ", ".join(modules)],
+                              env=env, cwd=cfg, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+        if proc.returncode != 0:
+            raise SystemExit(proc.stderr.strip().splitlines()[-1])
+        return parse_importtime(proc.stderr), (Path(cfg) / "lsfgvk-launcher").exists()
+
+def _is_gi(module: str) -> bool:
+    return module == "gi" or module.startswith("gi.")
+
+def total_ms(tree: list[tuple[int, int, int, str]], modules: list[str]) -> float:
+    # top-level entries only (site, encodings… are interpreter startup, not ours), minus the
+    # gi imports made directly by the launcher
+    ours = sum(cum for depth, _self, cum, m in tree if depth == 0 and m in modules)
+    gi = sum(cum for depth, _self, cum, m in tree if depth == 1 and _is_gi(m))
+    return (ours - gi) / 1000.0
+
+# ---------------- CLI ----------------
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description="LSFG-VK Launcher startup import budget (python -X importtime)")
+    ap.add_argument("--budget-ms", type=float, default=DEFAULT_BUDGET_MS, help="fail when the best run is slower")
+    ap.add_argument("--runs", type=int, default=5, help="cold interpreters to start (best one counts)")
+    ap.add_argument("--tree", action="store_true", help="print the 15 slowest imports of the best run")
+    args = ap.parse_args()
+
+    modules = startup_imports()
+    with tempfile.TemporaryDirectory(prefix="lsfgvk-pycache-") as pycache:
+        run_once(modules, pycache)     # fills the bytecode cache
+        runs = [run_once(modules, pycache) for _ in range(max(1, args.runs))]
+    tree = min(runs, key=lambda r: total_ms(r[0], modules))[0]
+    best = total_ms(tree, modules)
+    print(f"importtime: {', '.join(modules)}: {best:.1f} ms (best of {len(runs)}, budget {args.budget_ms:g} ms)")
+    if args.tree:
+        for _depth, self_us, cum, module in sorted(tree, key=lambda e: -e[2])[:15]:
+            print(f"  {cum / 1000.0:8.2f} ms  (self {self_us / 1000.0:6.2f})  {module}")
+
+    failures = []
+    if best > args.budget_ms:
+        failures.append(f"{best:.1f} ms over the {args.budget_ms:g} ms budget")
+    loaded = {m for _d, _s, _c, m in tree}   # includes what gi pulls in: keep DEFERRED to our own concerns
+    for module in DEFERRED:
+        if module in loaded:
+            failures.append(f"{module} is imported at startup")
+    if any(t for _tree, t in runs):
+        failures.append("importing created the config dir")
+    for f in failures:
+        print(f"FAIL {f}")
+    return 1 if failures else 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
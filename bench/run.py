@@ -0,0 +1,446 @@
+#!/usr/bin/env python3
+# SPDX-License-Identifier: MIT
+#
+# LSFG-VK Launcher — benchmark suite
+# - Runs against bench/fakehost (stand-in flatpak-spawn + flatpak), no Flatpak or GTK needed
+# - Synthetic inventories / favorite sets from 10 to 10,000 entries
+# - Results compared to a JSON baseline; regressions beyond --tolerance fail the run
+# - Each benchmark is preceded by a fixed pure-Python calibration loop timed in the same
+#   process; when this run's median calibration is slower than the baseline's, ratios are
+#   divided by that factor, so a baseline recorded on one machine still gates runs on a slower
+#   one (CI, laptop). Never scaled the other way: subprocess-bound benchmarks do not speed up
+#   with the CPU, and would show as regressions on a faster machine
+#
+# - A benchmark over the tolerance is measured again (up to RETRIES times, best median kept):
+#   a regression has to reproduce, a burst of load on the box does not
+# - --quick runs shorter, noisier measurements: they have their own baseline
+#   (baseline-quick.json) and are never compared with a full-mode one
+#
+#   python3 bench/run.py                      # run + compare with bench/baselines/baseline.json
+#   python3 bench/run.py --update-baseline    # run + overwrite the baseline
+#   python3 bench/run.py --quick -k settings  # fewer sizes, only matching benchmarks (baseline-quick.json)
+#   python3 bench/run.py --latency-ms 20      # simulate a slow flatpak-spawn round-trip
+
+import os
+import sys
+import json
+import time
+import argparse
+import shutil
+import platform
+import tempfile
+import statistics
+import subprocess
+from pathlib import Path
+
+BENCH_DIR = Path(__file__).resolve().parent
+ROOT = BENCH_DIR.parent
+FAKEHOST = BENCH_DIR / "fakehost"
+DEFAULT_BASELINE = BENCH_DIR / "baselines" / "baseline.json"
+QUICK_BASELINE = BENCH_DIR / "baselines" / "baseline-quick.json"
+RETRIES = 2   # extra measurements of a benchmark over the tolerance before it counts
+
+SIZES = [10, 100, 1000, 10000]
+QUICK_SIZES = [10, 1000]
+
+# ---------------- Environment ----------------
+
+def setup_env(latency_ms: int) -> Path:
+    """
+    Point the app at a throwaway config dir and the fake host. Must run before importing lsfgvk_core.
+    """
+    cfg = Path(tempfile.mkdtemp(prefix="lsfgvk-bench-"))
+    os.environ["XDG_CONFIG_HOME"] = str(cfg)
+    os.environ["PATH"] = f"{FAKEHOST}{os.pathsep}{os.environ.get('PATH', '')}"
+    os.environ["LSFGVK_FAKE_LATENCY_MS"] = str(latency_ms)
+    os.environ.pop("LSFGVK_TRACE", None)
+    sys.path.insert(0, str(ROOT / "app"))
+    return cfg
+
+def fake_inventory_output(n: int) -> str:
+    env = dict(os.environ, LSFGVK_FAKE_APPS=str(n))
+    return subprocess.run([str(FAKEHOST / "flatpak"), "list"], env=env, stdout=subprocess.PIPE, text=True, check=True).stdout
+
+def synthetic_favorites(n: int) -> list[dict]:
+    favs = []
+    for i in range(n):
+        mode = "flatpak" if i % 2 == 0 else "host"
+        favs.append({
+            "name": f"Preset {i}",
+            "mode": mode,
+            "target": f"org.bench.App{i}" if mode == "flatpak" else "true",
+            "options": {
+                "multiplier": 2 + (i % 3), "flow_scale": i % 4, "performance": bool(i % 2), "hdr": False,
+                "present_mode": "", "lsfg_process": f"game{i}.exe" if i % 5 == 0 else "",
+                "extra_args": "--fullscreen" if i % 3 == 0 else "", "mangohud": bool(i % 7 == 0),
+                "extra_layers": "",
+            },
+        })
+    return favs
+
+def synthetic_rules(n: int) -> list:
+    """
+    Mix of the four shapes the matcher handles differently: literal, prefix glob,
+    general glob and regex.
+    """
+    from lsfgvk_rules import Rule
+    rules = []
+    for i in range(n):
+        k = i % 4
+        if k == 0:
+            rules.append(Rule("flatpak", f"org.bench.App{i}", f"Preset {i}", "flatpak"))
+        elif k == 1:
+            rules.append(Rule("flatpak", f"org.vendor{i}.*", f"Preset {i}", "flatpak", priority=1))
+        elif k == 2:
+            rules.append(Rule("host", f"game{i}*.sh", f"Preset {i}", "host"))
+        else:
+            rules.append(Rule("process", rf"Game{i}-\w+\.exe", f"Preset {i}", "host", kind="regex", priority=2))
+    return rules
+
+# ---------------- Timing ----------------
+
+def measure(fn, min_time: float, repeats: int, max_loops: int = 1_000_000) -> dict:
+    """
+    timeit-style: calibrate a loop count so one repeat lasts ~min_time, then take `repeats` samples.
+    Reports per-call microseconds.
+    """
+    loops = 1
+    while True:
+        t0 = time.perf_counter()
+        for _ in range(loops):
+            fn()
+        dt = time.perf_counter() - t0
+        if dt >= min_time or loops >= max_loops:
+            break
+        loops = min(max_loops, loops * 10 if dt < min_time / 10 else loops * 2)
+    samples = []
+    for _ in range(repeats):
+        t0 = time.perf_counter()
+        for _ in range(loops):
+            fn()
+        samples.append((time.perf_counter() - t0) / loops * 1e6)
+    samples.sort()
+    return {
+        "median_us": statistics.median(samples),
+        "min_us": samples[0],
+        "max_us": samples[-1],
+        "loops": loops,
+        "repeats": repeats,
+    }
+
+_CALIBRATION_DATA = {f"key{i}": [i, str(i), i * 0.5] for i in range(64)}
+
+def calibration_workload() -> None:
+    # the same kind of work as the app's hot paths: dicts, strings, json, sorting
+    text = json.dumps(_CALIBRATION_DATA)
+    data = json.loads(text)
+    sorted(data, key=lambda k: data[k][2])
+    "|".join(k.upper() for k in data)
+
+def calibrate(min_time: float, repeats: int) -> float:
+    # fastest repeat: the least disturbed by other load, i.e. the machine's speed right now
+    return measure(calibration_workload, min_time, repeats)["min_us"]
+
+# ---------------- Benchmarks ----------------
+
+def collect(sizes: list[int]):
+    """
+    Yields (name, callable). Heavy setup happens here, outside the timed region.
+    """
+    import lsfgvk_core as core
+    from lsfgvk_trace import TRACER
+
+    # parsing + sorting of `flatpak list` output
+    for n in sizes:
+        out = fake_inventory_output(n)
+        yield f"flatpak.parse[{n}]", lambda out=out: core.parse_flatpak_list(out)
+
+    # full inventory through the fake host (two flatpak-spawn round-trips)
+    for n in sizes:
+        def list_n(n=n):
+            os.environ["LSFGVK_FAKE_APPS"] = str(n)
+            rows = core.list_flatpaks()
+            assert len(rows) == n, len(rows)
+        yield f"flatpak.list_host[{n}]", list_n
+
+    # env + argv construction
+    opts = core.Options(multiplier=3, flow_scale=1, performance=True, present_mode="mailbox",
+                        lsfg_process="game.exe", extra_args="--fullscreen -w 1920", mangohud=True,
+                        extra_layers="VK_LAYER_a:VK_LAYER_b")
+    yield "env.build", lambda: core.build_env(opts)
+    yield "argv.flatpak", lambda: core.flatpak_launch_cmd("org.bench.App", core.build_env(opts), core.split_args(opts.extra_args))
+    yield "argv.host", lambda: core.host_launch_cmd("retroarch", core.build_env(opts), core.split_args(opts.extra_args))
+    fav = synthetic_favorites(1)[0]
+    yield "argv.favorite", lambda: core.favorite_launch_cmd(fav)
+
+    # settings persistence with large favorite sets: the small document is rewritten on save,
+    # favorites go through the journal (one append per change, replay = snapshot + tail)
+    from lsfgvk_journal import Journal
+    for n in sizes:
+        s = core.Settings(favorites=synthetic_favorites(n))
+        core.replace_collections(s)
+        core.store().compact()
+        yield f"settings.save[{n}]", lambda s=s: core.save_settings(s)
+
+        def load_n(n=n):
+            def run():
+                loaded = core.load_settings()
+                assert len(loaded.favorites) == n
+            return run
+        yield f"settings.load[{n}]", load_n()
+
+        fav = dict(s.favorites[n // 2])
+        yield f"store.put_favorite[{n}]", lambda s=s, fav=fav: core.put_favorite(s, fav)
+
+        # tail replay cost: n records on top of the snapshot
+        jdir = Path(tempfile.mkdtemp(prefix="lsfgvk-journal-"))
+        j = Journal(jdir, min_compact_bytes=1 << 40)
+        for f in s.favorites:
+            j.put("favorite", f"{f['mode']}:{f['name']}", f)
+        j.close()
+        yield f"store.replay[{n}]", lambda j=j: j.load()
+
+    # auto-profile rules: compile once, then match per selection/launch
+    from lsfgvk_rules import Matcher, subjects_for
+    for n in sizes:
+        rules = synthetic_rules(n)
+        yield f"rules.compile[{n}]", lambda rules=rules: Matcher(rules)
+        matcher = Matcher(rules)
+        last_glob, last_regex = (n - 3) // 4 * 4 + 2, (n - 4) // 4 * 4 + 3   # deepest entries
+        hit = subjects_for("host", f"/opt/games/game{last_glob}-x.sh", "", f"Game{last_regex}-win64.exe")
+        miss = subjects_for("flatpak", "org.nomatch.App")
+        def match_n(matcher=matcher, hit=hit, miss=miss):
+            assert matcher.match(hit) is not None
+            assert matcher.match(miss) is None
+        yield f"rules.match[{n}]", match_n
+
+    # launch history: enqueue cost on the launch path, frecency query over N launches
+    from lsfgvk_history import History
+    hist_opts = core.Options()
+    yield "history.record", lambda: core.record_launch("host", "true", "Preset 1", hist_opts)
+    for n in sizes:
+        h = History(Path(tempfile.mkdtemp(prefix="lsfgvk-history-")) / "history.sqlite3")
+        now = time.time()
+        h.import_rows([("flatpak", f"org.bench.App{i % 200}", f"Preset {i % 50}", "", now - (i % 400) * 86400.0)
+                       for i in range(n)])
+        h.flush()
+        yield f"history.frecency[{n}]", lambda h=h: h.frecency("flatpak")
+        yield f"history.rank_favorites[{n}]", lambda h=h: h.rank("flatpak", [f"Preset {i}" for i in range(50)], by="preset")
+
+    # exported launchers: incremental re-export after one favorite changed, script start-up
+    import lsfgvk_export as export
+    for n in [n for n in sizes if n <= 1000]:
+        s = core.Settings(favorites=synthetic_favorites(n))
+        edir = Path(tempfile.mkdtemp(prefix="lsfgvk-export-"))
+        export.export_favorites(s, edir)
+        fav = s.favorites[n // 2]
+        def reexport(s=s, edir=edir, fav=fav):
+            fav["options"]["flow_scale"] = 1 - fav["options"].get("flow_scale", 0)
+            res = export.export_favorites(s, edir)
+            assert len(res.written) == 1, res
+        yield f"export.incremental[{n}]", reexport
+    script = edir / export.read_manifest(edir)[core.favorite_key(fav["mode"], fav["name"])]["script"]
+    dry_env = dict(os.environ, **{export.DRY_RUN_ENV: "1"})
+    yield "export.script_dry_run", lambda: subprocess.run(["sh", str(script)], env=dry_env, stdout=subprocess.DEVNULL, check=True)
+
+    # end-to-end headless launch: probe + save + spawn + child exit
+    settings = core.Settings(favorites=synthetic_favorites(2))
+    for fav in settings.favorites:
+        def launch(fav=fav):
+            core.launch_favorite(settings, fav).wait()
+        yield f"launch.headless.{fav['mode']}", launch
+
+    # LSFG_PROCESS watcher: incremental tree tick vs. a full /proc walk (what it avoids)
+    import lsfgvk_hostagent as agent
+    for n in (10, 100):
+        root = subprocess.Popen(["sh", "-c", f"for i in $(seq {n}); do sleep 60 & done; wait"], start_new_session=True)
+        tree = agent.ProcTree(root.pid)
+        deadline = time.monotonic() + 10
+        while len(tree.pids) < n + 1 and time.monotonic() < deadline:
+            tree.tick()
+            time.sleep(0.02)
+        yield f"procwatch.tick[{n}]", tree.tick
+        tree.close()
+        os.killpg(root.pid, 9)
+        root.wait()
+    # a fixed number of stat reads: the box's process count must not move the result
+    def full_walk():
+        pids = [int(e) for e in os.listdir("/proc") if e.isdigit()]
+        return [agent.read_stat(pids[i % len(pids)]) for i in range(64)]
+    yield "procwatch.full_walk", full_walk
+
+    # resource sampler: one tree-wide sample (stat + io + per-thread status); at the default 1 s
+    # interval, the agent's CPU % is this time / 10 ms (budget: 0.5 % = 5 ms per sample)
+    for n in (10, 100):
+        root = subprocess.Popen(["sh", "-c", f"for i in $(seq {n}); do sleep 60 & done; wait"], start_new_session=True)
+        tree = agent.ProcTree(root.pid)
+        deadline = time.monotonic() + 10
+        while len(tree.pids) < n + 1 and time.monotonic() < deadline:
+            tree.tick()
+            time.sleep(0.02)
+        sampler = agent.TreeSampler()
+        sampler.sample(tree.pids)
+        yield f"sampler.sample[{n}]", lambda sampler=sampler, tree=tree: sampler.sample(tree.pids)
+        sampler.close()
+        tree.close()
+        os.killpg(root.pid, 9)
+        root.wait()
+    from lsfgvk_sampler import Session
+    session = Session("host", "bench")
+    ev = {"ev": "sample", "cpu": 97.5, "rss": 1 << 30, "threads": 64, "csw": 12000.0, "io_r": 0, "io_w": 4096}
+    yield "sampler.session_add", lambda: session.add(ev)
+    # app side, per sample: the reader thread parses the agent's line, then the window redraws
+    # one sparkline per graphed metric (the cairo stroke itself is not measured here)
+    from lsfgvk_sampler import sparkline_points
+    line = json.dumps(dict(ev, t=time.time(), interval=1.0, procs=12, ivcsw=0.1)) + "\n"
+    yield "sampler.reader_event", lambda: session.on_event(json.loads(line))
+    for _ in range(session.rings["cpu"].size):
+        session.add(ev)
+    yield "sampler.sparkline_points[300]", lambda: sparkline_points(session.rings["cpu"], 240, 32)
+    me = os.getpid()
+    yield "procwatch.maps_probe", lambda: agent.maps_contain(me, b"libvulkan")
+
+    # tracing must stay (nearly) free when disabled
+    TRACER.enabled = False
+    def span_off():
+        with TRACER.span("bench"):
+            pass
+    yield "trace.span_disabled", span_off
+
+# ---------------- Baseline ----------------
+
+def machine_info() -> dict:
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "cpus": os.cpu_count(),
+    }
+
+def slowdown(results: dict, baseline: dict) -> float:
+    """
+    How much slower this machine runs the calibration loop than the baseline's did (>= 1).
+    """
+    ours = [r["calibration_us"] for r in results.values() if "calibration_us" in r]
+    theirs = [r["calibration_us"] for r in baseline.get("results", {}).values() if "calibration_us" in r]
+    if not ours or not theirs:
+        return 1.0
+    return max(1.0, statistics.median(ours) / statistics.median(theirs))
+
+def compare(results: dict, baseline: dict, tolerance: float, speed: float = 1.0) -> list[str]:
+    regressions = []
+    base = baseline.get("results", {})
+    for name, res in results.items():
+        ref = base.get(name)
+        if not ref:
+            continue
+        ratio = res["median_us"] / (ref["median_us"] * speed) if ref["median_us"] > 0 else 1.0
+        res["baseline_us"] = ref["median_us"]
+        res["ratio"] = ratio
+        if ratio > tolerance:
+            regressions.append(name)
+    return regressions
+
+def print_table(results: dict, regressions: list[str]) -> None:
+    if not results:
+        print("(no benchmark matched)")
+        return
+    width = max(len(n) for n in results)
+    print(f"{'benchmark':<{width}}  {'median':>12}  {'min':>12}  {'baseline':>12}  {'ratio':>6}")
+    for name, r in results.items():
+        base = f"{r['baseline_us']:.1f}us" if "baseline_us" in r else "-"
+        ratio = f"{r['ratio']:.2f}" if "ratio" in r else "-"
+        flag = "  REGRESSION" if name in regressions else ""
+        print(f"{name:<{width}}  {r['median_us']:>10.1f}us  {r['min_us']:>10.1f}us  {base:>12}  {ratio:>6}{flag}")
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description="LSFG-VK Launcher benchmarks (simulated flatpak-spawn host)")
+    ap.add_argument("-k", dest="pattern", default="", help="only run benchmarks whose name contains this")
+    ap.add_argument("--quick", action="store_true", help="fewer sizes and shorter runs")
+    ap.add_argument("--latency-ms", type=int, default=0, help="simulated flatpak-spawn round-trip latency")
+    ap.add_argument("--baseline", type=Path, help="default: baselines/baseline.json (baseline-quick.json with --quick)")
+    ap.add_argument("--update-baseline", action="store_true", help="write results as the new baseline")
+    ap.add_argument("--tolerance", type=float, default=1.5, help="fail when median > baseline * tolerance")
+    ap.add_argument("--json", type=Path, help="also write raw results to this file")
+    args = ap.parse_args()
+    if args.baseline is None:
+        args.baseline = QUICK_BASELINE if args.quick else DEFAULT_BASELINE
+    # checked before running: shorter runs measure differently (fewer loops, more noise), so
+    # their ratios against a full-mode baseline mean nothing, and merging would mix both
+    baseline: dict | None = None
+    if args.baseline.exists() and (args.pattern or not args.update_baseline):
+        baseline = json.loads(args.baseline.read_text(encoding="utf-8"))
+        recorded = bool(baseline.get("meta", {}).get("quick"))
+        if recorded != args.quick:
+            print(f"error: {args.baseline} was recorded in {'quick' if recorded else 'full'} mode; run "
+                  f"{'with' if recorded else 'without'} --quick or pass a matching --baseline", file=sys.stderr)
+            return 2
+
+    cfg = setup_env(args.latency_ms)
+    sizes = QUICK_SIZES if args.quick else SIZES
+    min_time = 0.05 if args.quick else 0.2
+    repeats = 3 if args.quick else 5
+
+    results: dict[str, dict] = {}
+    for name, fn in collect(sizes):
+        if args.pattern and args.pattern not in name:
+            continue
+        # subprocess-bound benchmarks: keep loop counts small
+        max_loops = 50 if name.startswith(("flatpak.list_host", "launch.")) else 1_000_000
+        calibration_us = calibrate(min_time, repeats)
+        res = measure(fn, min_time, repeats, max_loops)
+        # a burst of load on the box slows one measurement down: re-measure before calling it a
+        # regression (here, while the benchmark's fixtures are still open), keep the best
+        ref = (baseline or {}).get("results", {}).get(name) if not args.update_baseline else None
+        for _ in range(RETRIES):
+            if not ref or res["median_us"] <= ref["median_us"] * args.tolerance:
+                break
+            retry = measure(fn, min_time, repeats, max_loops)
+            retry["retries"] = res.get("retries", 0) + 1
+            res = retry if retry["median_us"] < res["median_us"] else dict(res, retries=retry["retries"])
+        results[name] = res
+        results[name]["calibration_us"] = calibration_us
+        print(f"  {name}: {results[name]['median_us']:.1f}us", file=sys.stderr)
+    shutil.rmtree(cfg, ignore_errors=True)
+
+    meta = {"machine": machine_info(), "latency_ms": args.latency_ms, "quick": args.quick}
+    regressions: list[str] = []
+    gate = True
+    if baseline is not None and not args.update_baseline:
+        base_meta = baseline.get("meta", {})
+        if base_meta.get("latency_ms") != args.latency_ms:
+            print(f"note: baseline recorded with latency_ms={base_meta.get('latency_ms')}", file=sys.stderr)
+        calibrated = any("calibration_us" in r for r in baseline.get("results", {}).values())
+        if not calibrated and base_meta.get("machine") != meta["machine"]:
+            # nothing to normalize with: raw timings from another machine cannot fail the run
+            gate = False
+            print("note: uncalibrated baseline from a different machine; regressions are warnings only",
+                  file=sys.stderr)
+        speed = slowdown(results, baseline)
+        if speed > 1.0:
+            print(f"note: calibration loop x{speed:.2f} slower than for the baseline; ratios divided by it",
+                  file=sys.stderr)
+        regressions = compare(results, baseline, args.tolerance, speed)
+
+    print_table(results, regressions)
+
+    doc = {"meta": meta, "results": results}
+    if args.json:
+        args.json.write_text(json.dumps(doc, indent=2), encoding="utf-8")
+    if args.update_baseline:
+        args.baseline.parent.mkdir(parents=True, exist_ok=True)
+        if args.baseline.exists() and args.pattern:
+            # partial run: merge into the existing baseline
+            old = json.loads(args.baseline.read_text(encoding="utf-8"))
+            old.get("results", {}).update(results)
+            doc = {"meta": meta, "results": old.get("results", {})}
+        args.baseline.write_text(json.dumps(doc, indent=2, sort_keys=True) + "\n", encoding="utf-8")
+        print(f"baseline written: {args.baseline}", file=sys.stderr)
+
+    if regressions:
+        print(f"\n{len(regressions)} regression(s) over x{args.tolerance}: {', '.join(regressions)}", file=sys.stderr)
+        return 1 if gate else 0
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())